@@ -1,21 +1,67 @@
 """
 FastAPI dependencies for authentication, database sessions, etc.
 """
-from typing import Generator
+from dataclasses import dataclass
+import threading
+from typing import Dict, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+from app.core.config import settings
+from app.core.database import get_async_db
 from app.core.security import verify_token
 from app.models.base import User
+from app.services.cache_service import TTLCache, invalidate_after_commit
 
 security = HTTPBearer()
 
-def get_current_user(
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The slice of a user that authorization checks need"""
+    id: int
+    role: str
+    is_active: bool
+    company_id: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            role=user.role,
+            is_active=user.is_active,
+            company_id=getattr(user, "company_id", None)
+        )
+
+# user id -> UserSnapshot; per process, so the TTL bounds staleness across workers.
+# Each user has a version that every committed write bumps, so a read that
+# raced a write never caches the pre-commit row.
+user_snapshot_cache = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+_user_versions: Dict[int, int] = {}
+_user_versions_lock = threading.Lock()
+
+def invalidate_user_snapshot(user_id: int) -> None:
+    """Forget a cached user so the next request re-reads it"""
+    with _user_versions_lock:
+        _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+    user_snapshot_cache.invalidate(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_write(mapper, connection, user: User) -> None:
+    # Login, deactivation and password reset all flush a User update; the
+    # snapshot is dropped once that commits, not at flush
+    invalidate_after_commit(object_session(user), invalidate_user_snapshot, user.id)
+
+async def get_current_user(
     token: str = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Get current authenticated user
+
+    Returns a cached UserSnapshot; the users table is only read on a miss.
+    """
     try:
         payload = verify_token(token.credentials)
         user_id = payload.get("sub")
@@ -25,13 +71,19 @@ def get_current_user(
                 detail="Invalid token"
             )
         
-        # Get user from database
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = user_snapshot_cache.get(int(user_id))
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
+            version = _user_versions.get(int(user_id), 0)
+            # Get user from database
+            db_user = await db.scalar(select(User).where(User.id == int(user_id)))
+            if db_user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            user = UserSnapshot.from_user(db_user)
+            if _user_versions.get(user.id, 0) == version:
+                user_snapshot_cache.set(user.id, user)
         
         if not user.is_active:
             raise HTTPException(
@@ -47,8 +99,8 @@ def get_current_user(
         )
 
 def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user)
+) -> UserSnapshot:
     """Require admin privileges"""
     if current_user.role != "admin":
         raise HTTPException(
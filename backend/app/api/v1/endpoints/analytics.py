@@ -2,65 +2,92 @@
 Safe analytics endpoints with universal min-n enforcement
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import base64
+import uuid
 
-from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.api.deps import UserSnapshot, get_current_user
 from app.core.privacy import (
     enforce_min_n, safe_aggregate_with_fallback, safe_response_count,
-    safe_percentage, mask_pii, get_privacy_settings, validate_team_access
+    safe_percentage, mask_pii, get_org_privacy_settings_async, get_team_acl_async
 )
-from app.models.base import User, Team
-from app.models.advanced import UserTeam
 from app.models.responses import NumericResponse, Comment
 from app.models.summaries import (
     ParticipationSummary, DriverSummary, SentimentSummary, 
     OrgDriverTrends, ReportsCache, CommentNLP
 )
+from app.services.cache_service import TTLCache
 from app.services.summary_service import SummaryService
 
 router = APIRouter()
 
+# (survey_id, team scope, driver_id) -> comment count for the min-n check
+comment_count_cache = TTLCache(settings.COMMENT_COUNT_CACHE_MAX_SIZE, settings.COMMENT_COUNT_CACHE_TTL_SECONDS)
+
+def _encode_comment_cursor(comment: Comment) -> str:
+    raw = f"{comment.ts.isoformat()}|{comment.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_comment_cursor(cursor: str):
+    """Return (ts, id) from a cursor; raises ValueError if malformed"""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    ts, comment_id = raw.split("|", 1)
+    return datetime.fromisoformat(ts), uuid.UUID(comment_id)
+
+def _has_theme(themes_column, theme: str, dialect_name: str):
+    """Match rows whose JSON themes array contains theme"""
+    if dialect_name == "postgresql":
+        return cast(themes_column, JSONB).contains([theme])
+    themes = func.json_each(themes_column).table_valued("value")
+    return select(themes.c.value).where(themes.c.value == theme).exists()
+
+def _month_key(column, dialect_name: str):
+    """'YYYY-MM' bucket of a timestamp column for GROUP BY"""
+    if dialect_name == "postgresql":
+        return func.to_char(func.date_trunc("month", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
 @router.get("/participation/{survey_id}")
 async def get_participation_analytics(
     survey_id: str,
     team_id: Optional[str] = Query(None, description="Team ID (optional)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get participation analytics with min-n enforcement"""
     try:
         # Get privacy settings
-        privacy_settings = get_privacy_settings(current_user.company_id, db)
+        privacy_settings = await get_org_privacy_settings_async(current_user.company_id, db)
         
         # Build query
-        query = db.query(ParticipationSummary).filter(
+        query = select(ParticipationSummary).where(
             ParticipationSummary.survey_id == survey_id
         )
         
         # Filter by team if specified
+        team_acl = await get_team_acl_async(current_user.id, current_user.role, db)
         if team_id:
             # Validate team access
-            if not validate_team_access(current_user.id, team_id, db):
+            if not team_acl.can_access(team_id):
                 raise HTTPException(status_code=403, detail="Access denied to team data")
-            query = query.filter(ParticipationSummary.team_id == team_id)
+            query = query.where(ParticipationSummary.team_id == team_id)
         else:
             # For org-wide data, only show teams user has access to
-            if current_user.role == 'manager':
-                user_teams = db.query(Team.id).join(UserTeam).filter(
-                    UserTeam.user_id == current_user.id
-                ).all()
-                team_ids = [str(t.id) for t in user_teams]
-                query = query.filter(ParticipationSummary.team_id.in_(team_ids))
+            query = team_acl.scope(query, ParticipationSummary.team_id)
         
-        summaries = query.all()
+        summaries = (await db.scalars(query)).all()
         
         # Apply min-n enforcement
         safe_data = []
         for summary in summaries:
-            if enforce_min_n(summary.respondents, privacy_settings.min_n, current_user.company_id, db):
+            if enforce_min_n(summary.respondents, privacy_settings.min_n):
                 safe_data.append({
                     "team_id": str(summary.team_id),
                     "respondents": summary.respondents,
@@ -84,49 +111,55 @@ async def get_driver_analytics(
     survey_id: str,
     team_id: Optional[str] = Query(None, description="Team ID (optional)"),
     driver_id: Optional[str] = Query(None, description="Driver ID (optional)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get driver analytics with min-n enforcement"""
     try:
         # Get privacy settings
-        privacy_settings = get_privacy_settings(current_user.company_id, db)
+        privacy_settings = await get_org_privacy_settings_async(current_user.company_id, db)
         
         # Build query
-        query = db.query(DriverSummary).filter(
+        query = select(DriverSummary).where(
             DriverSummary.survey_id == survey_id
         )
         
         # Apply filters
+        team_acl = await get_team_acl_async(current_user.id, current_user.role, db)
         if team_id:
-            if not validate_team_access(current_user.id, team_id, db):
+            if not team_acl.can_access(team_id):
                 raise HTTPException(status_code=403, detail="Access denied to team data")
-            query = query.filter(DriverSummary.team_id == team_id)
+            query = query.where(DriverSummary.team_id == team_id)
         else:
             # For org-wide data, only show teams user has access to
-            if current_user.role == 'manager':
-                user_teams = db.query(Team.id).join(UserTeam).filter(
-                    UserTeam.user_id == current_user.id
-                ).all()
-                team_ids = [str(t.id) for t in user_teams]
-                query = query.filter(DriverSummary.team_id.in_(team_ids))
+            query = team_acl.scope(query, DriverSummary.team_id)
         
         if driver_id:
-            query = query.filter(DriverSummary.driver_id == driver_id)
+            query = query.where(DriverSummary.driver_id == driver_id)
+        
+        summaries = (await db.scalars(query)).all()
         
-        summaries = query.all()
+        # Response counts for every (team, driver) in one grouped query
+        counts_query = select(
+            NumericResponse.team_id, NumericResponse.driver_id, func.count(NumericResponse.id)
+        ).where(NumericResponse.survey_id == survey_id)
+        if team_id:
+            counts_query = counts_query.where(NumericResponse.team_id == team_id)
+        if driver_id:
+            counts_query = counts_query.where(NumericResponse.driver_id == driver_id)
+        counts_query = counts_query.group_by(NumericResponse.team_id, NumericResponse.driver_id)
+        response_counts = {
+            (str(row_team_id), str(row_driver_id)): count
+            for row_team_id, row_driver_id, count in await db.execute(counts_query)
+        }
         
         # Apply min-n enforcement
         safe_data = []
         for summary in summaries:
             # Check if we have enough responses for this driver
-            response_count = db.query(NumericResponse).filter(
-                NumericResponse.survey_id == survey_id,
-                NumericResponse.team_id == summary.team_id,
-                NumericResponse.driver_id == summary.driver_id
-            ).count()
+            response_count = response_counts.get((str(summary.team_id), str(summary.driver_id)), 0)
             
-            if enforce_min_n(response_count, privacy_settings.min_n, current_user.company_id, db):
+            if enforce_min_n(response_count, privacy_settings.min_n):
                 safe_data.append({
                     "team_id": str(summary.team_id),
                     "driver_id": str(summary.driver_id),
@@ -151,45 +184,48 @@ async def get_driver_analytics(
 async def get_sentiment_analytics(
     survey_id: str,
     team_id: Optional[str] = Query(None, description="Team ID (optional)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get sentiment analytics with min-n enforcement"""
     try:
         # Get privacy settings
-        privacy_settings = get_privacy_settings(current_user.company_id, db)
+        privacy_settings = await get_org_privacy_settings_async(current_user.company_id, db)
         
         # Build query
-        query = db.query(SentimentSummary).filter(
+        query = select(SentimentSummary).where(
             SentimentSummary.survey_id == survey_id
         )
         
         # Apply filters
+        team_acl = await get_team_acl_async(current_user.id, current_user.role, db)
         if team_id:
-            if not validate_team_access(current_user.id, team_id, db):
+            if not team_acl.can_access(team_id):
                 raise HTTPException(status_code=403, detail="Access denied to team data")
-            query = query.filter(SentimentSummary.team_id == team_id)
+            query = query.where(SentimentSummary.team_id == team_id)
         else:
             # For org-wide data, only show teams user has access to
-            if current_user.role == 'manager':
-                user_teams = db.query(Team.id).join(UserTeam).filter(
-                    UserTeam.user_id == current_user.id
-                ).all()
-                team_ids = [str(t.id) for t in user_teams]
-                query = query.filter(SentimentSummary.team_id.in_(team_ids))
+            query = team_acl.scope(query, SentimentSummary.team_id)
+        
+        summaries = (await db.scalars(query)).all()
         
-        summaries = query.all()
+        # Comment counts for every team in one grouped query
+        counts_query = select(Comment.team_id, func.count(Comment.id)).where(Comment.survey_id == survey_id)
+        if team_id:
+            counts_query = counts_query.where(Comment.team_id == team_id)
+        counts_query = counts_query.group_by(Comment.team_id)
+        comment_counts = {
+            str(row_team_id): count
+            for row_team_id, count in await db.execute(counts_query)
+        }
         
         # Apply min-n enforcement
         safe_data = []
         for summary in summaries:
             # Check if we have enough comments for this team
-            comment_count = db.query(Comment).filter(
-                Comment.survey_id == survey_id,
-                Comment.team_id == summary.team_id
-            ).count()
+            comment_count = comment_counts.get(str(summary.team_id), 0)
             
-            if enforce_min_n(comment_count, privacy_settings.min_n, current_user.company_id, db):
+            if enforce_min_n(comment_count, privacy_settings.min_n):
                 safe_data.append({
                     "team_id": str(summary.team_id),
                     "pos_pct": summary.pos_pct,
@@ -214,51 +250,77 @@ async def get_comments_analytics(
     team_id: Optional[str] = Query(None, description="Team ID (optional)"),
     driver_id: Optional[str] = Query(None, description="Driver ID (optional)"),
     sentiment: Optional[str] = Query(None, description="Sentiment filter (+/0/-)"),
-    limit: int = Query(10, description="Number of comments to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    theme: Optional[str] = Query(None, description="Theme filter (optional)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(10, ge=1, le=100, description="Number of comments to return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    """Get comments with PII masking and min-n enforcement"""
+    """Get comments with PII masking and min-n enforcement
+    
+    Comments are returned newest first; pass next_cursor back as cursor
+    to fetch the following page.
+    """
     try:
         # Get privacy settings
-        privacy_settings = get_privacy_settings(current_user.company_id, db)
+        privacy_settings = await get_org_privacy_settings_async(current_user.company_id, db)
         
         # Build query
-        query = db.query(Comment).filter(Comment.survey_id == survey_id)
+        query = select(Comment).where(Comment.survey_id == survey_id)
         
         # Apply filters
+        team_acl = await get_team_acl_async(current_user.id, current_user.role, db)
         if team_id:
-            if not validate_team_access(current_user.id, team_id, db):
+            if not team_acl.can_access(team_id):
                 raise HTTPException(status_code=403, detail="Access denied to team data")
-            query = query.filter(Comment.team_id == team_id)
+            query = query.where(Comment.team_id == team_id)
+            team_scope = (team_id,)
         else:
             # For org-wide data, only show teams user has access to
-            if current_user.role == 'manager':
-                user_teams = db.query(Team.id).join(UserTeam).filter(
-                    UserTeam.user_id == current_user.id
-                ).all()
-                team_ids = [str(t.id) for t in user_teams]
-                query = query.filter(Comment.team_id.in_(team_ids))
+            query = team_acl.scope(query, Comment.team_id)
+            team_scope = tuple(team_acl.team_id_list) if team_acl.role == 'manager' else None
         
         if driver_id:
-            query = query.filter(Comment.driver_id == driver_id)
+            query = query.where(Comment.driver_id == driver_id)
         
         # Check min-n before returning comments
-        comment_count = query.count()
-        if not enforce_min_n(comment_count, privacy_settings.min_n, current_user.company_id, db):
+        count_key = (survey_id, team_scope, driver_id)
+        comment_count = comment_count_cache.get(count_key)
+        if comment_count is None:
+            comment_count = await db.scalar(select(func.count()).select_from(query.subquery()))
+            # Counts only grow, so one that meets min-n stays valid while cached
+            if enforce_min_n(comment_count, privacy_settings.min_n):
+                comment_count_cache.set(count_key, comment_count)
+        if not enforce_min_n(comment_count, privacy_settings.min_n):
             return {
                 "survey_id": survey_id,
                 "data": [],
                 "safe": False,
-                "message": privacy_settings.safe_fallback_message
+                "message": privacy_settings.safe_fallback_message,
+                "next_cursor": None
             }
         
         # Get comments with NLP analysis
-        comments_with_nlp = query.join(CommentNLP).limit(limit).all()
-        
-        # Apply sentiment filter if specified
+        query = query.join(CommentNLP).options(contains_eager(Comment.nlp))
         if sentiment:
-            comments_with_nlp = [c for c in comments_with_nlp if c.nlp.sentiment == sentiment]
+            query = query.where(CommentNLP.sentiment == sentiment)
+        if theme:
+            query = query.where(_has_theme(CommentNLP.themes, theme, db.bind.dialect.name))
+        if cursor:
+            try:
+                cursor_ts, cursor_id = _decode_comment_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(Comment.ts, Comment.id) < (cursor_ts, cursor_id))
+        
+        # One extra row tells us whether another page exists
+        comments_with_nlp = (await db.scalars(
+            query.order_by(Comment.ts.desc(), Comment.id.desc()).limit(limit + 1)
+        )).all()
+        next_cursor = None
+        if len(comments_with_nlp) > limit:
+            comments_with_nlp = comments_with_nlp[:limit]
+            next_cursor = _encode_comment_cursor(comments_with_nlp[-1])
         
         # Mask PII and format response
         safe_comments = []
@@ -278,7 +340,8 @@ async def get_comments_analytics(
             "survey_id": survey_id,
             "data": safe_comments,
             "safe": True,
-            "message": None
+            "message": None,
+            "next_cursor": next_cursor
         }
         
     except Exception as e:
@@ -289,42 +352,56 @@ async def get_trend_analytics(
     team_id: str,
     driver_id: Optional[str] = Query(None, description="Driver ID (optional)"),
     months: int = Query(12, description="Number of months to include"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get trend analytics with min-n enforcement"""
     try:
         # Validate team access
-        if not validate_team_access(current_user.id, team_id, db):
+        team_acl = await get_team_acl_async(current_user.id, current_user.role, db)
+        if not team_acl.can_access(team_id):
             raise HTTPException(status_code=403, detail="Access denied to team data")
         
         # Get privacy settings
-        privacy_settings = get_privacy_settings(current_user.company_id, db)
+        privacy_settings = await get_org_privacy_settings_async(current_user.company_id, db)
         
         # Build query
-        query = db.query(OrgDriverTrends).filter(OrgDriverTrends.team_id == team_id)
+        query = select(OrgDriverTrends).where(OrgDriverTrends.team_id == team_id)
         
         if driver_id:
-            query = query.filter(OrgDriverTrends.driver_id == driver_id)
+            query = query.where(OrgDriverTrends.driver_id == driver_id)
         
         # Get trends for specified months
         cutoff_date = datetime.utcnow().replace(day=1) - timedelta(days=30 * months)
-        query = query.filter(OrgDriverTrends.period_month >= cutoff_date.date())
+        query = query.where(OrgDriverTrends.period_month >= cutoff_date.date())
+        
+        trends = (await db.scalars(query.order_by(OrgDriverTrends.period_month))).all()
+        
+        # Respondent counts for every (driver, month) in one grouped query
+        month = _month_key(NumericResponse.ts, db.bind.dialect.name)
+        counts_query = select(
+            NumericResponse.driver_id, month, func.count(NumericResponse.id)
+        ).where(
+            NumericResponse.team_id == team_id,
+            NumericResponse.ts >= datetime.combine(cutoff_date.date(), datetime.min.time())
+        ).group_by(NumericResponse.driver_id, month)
+        if driver_id:
+            counts_query = counts_query.where(NumericResponse.driver_id == driver_id)
         
-        trends = query.order_by(OrgDriverTrends.period_month).all()
+        response_counts = {
+            (str(row_driver_id), row_month): count
+            for row_driver_id, row_month, count in await db.execute(counts_query)
+        }
         
         # Apply min-n enforcement
         safe_data = []
         for trend in trends:
             # Check if we have enough responses for this period
-            response_count = db.query(NumericResponse).filter(
-                NumericResponse.team_id == trend.team_id,
-                NumericResponse.driver_id == trend.driver_id,
-                NumericResponse.ts >= trend.period_month,
-                NumericResponse.ts < (trend.period_month.replace(month=trend.period_month.month + 1) if trend.period_month.month < 12 else trend.period_month.replace(year=trend.period_month.year + 1, month=1))
-            ).count()
+            response_count = response_counts.get(
+                (str(trend.driver_id), trend.period_month.strftime("%Y-%m")), 0
+            )
             
-            if enforce_min_n(response_count, privacy_settings.min_n, current_user.company_id, db):
+            if enforce_min_n(response_count, privacy_settings.min_n):
                 safe_data.append({
                     "driver_id": str(trend.driver_id),
                     "period_month": trend.period_month.isoformat(),
@@ -347,8 +424,8 @@ async def get_cached_report(
     scope: str = Query(..., description="Scope: 'org' or 'team:{id}'"),
     period_start: str = Query(..., description="Period start (YYYY-MM-DD)"),
     period_end: str = Query(..., description="Period end (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get cached report data"""
     try:
@@ -361,8 +438,9 @@ async def get_cached_report(
         end_date = datetime.strptime(period_end, "%Y-%m-%d").date()
         
         # Get cached report
-        summary_service = SummaryService(db)
-        cached_report = summary_service.get_reports_cache(org_id, scope, start_date, end_date)
+        cached_report = await db.run_sync(
+            lambda sync_db: SummaryService(sync_db).get_reports_cache(org_id, scope, start_date, end_date)
+        )
         
         if not cached_report:
             raise HTTPException(status_code=404, detail="Cached report not found")
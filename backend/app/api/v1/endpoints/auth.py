@@ -3,16 +3,17 @@ Authentication endpoints for FastAPI
 """
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime, timedelta
 import uuid
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, verify_token
 from app.models.base import User, UserSession, EmailVerificationToken, PasswordResetToken
-from app.api.deps import get_current_user
+from app.api.deps import UserSnapshot, get_current_user
 from app.core.email import email_service
 
 router = APIRouter()
@@ -57,10 +58,10 @@ class UserResponse(BaseModel):
     created_at: datetime
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return JWT tokens"""
     # Find user by email
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await db.scalar(select(User).where(User.email == login_data.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,7 +73,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         # Update failed login attempts
         user.failed_login_attempts += 1
         user.last_failed_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,7 +90,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     # Reset failed login attempts on successful login
     user.failed_login_attempts = 0
     user.last_login = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Create tokens
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -102,7 +103,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         expires_at=datetime.utcnow() + timedelta(days=7)
     )
     db.add(session)
-    db.commit()
+    await db.commit()
     
     return LoginResponse(
         access_token=access_token,
@@ -123,10 +124,10 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/register", response_model=RegisterResponse)
-async def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(register_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == register_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == register_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -145,8 +146,8 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Send verification email
     verification_token = str(uuid.uuid4())
@@ -156,9 +157,9 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
         expires_at=datetime.utcnow() + timedelta(hours=24)
     )
     db.add(token_record)
-    db.commit()
+    await db.commit()
     
-    # Send email (will be logged if not configured)
+    # Queue email; delivery happens off the request (logged if not configured)
     email_service.send_verification_email(
         new_user.email, 
         verification_token, 
@@ -172,14 +173,14 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
     )
 
 @router.post("/verify-email")
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: AsyncSession = Depends(get_async_db)):
     """Verify email address using token"""
     # Find verification token
-    token_record = db.query(EmailVerificationToken).filter(
+    token_record = await db.scalar(select(EmailVerificationToken).where(
         EmailVerificationToken.token == token,
         EmailVerificationToken.is_used == False,
         EmailVerificationToken.expires_at > datetime.utcnow()
-    ).first()
+    ))
     
     if not token_record:
         raise HTTPException(
@@ -188,7 +189,7 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
         )
     
     # Get user
-    user = db.query(User).filter(User.id == token_record.user_id).first()
+    user = await db.scalar(select(User).where(User.id == token_record.user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -198,14 +199,14 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
     # Mark email as verified
     user.is_email_verified = True
     token_record.is_used = True
-    db.commit()
+    await db.commit()
     
     return {"message": "Email verified successfully"}
 
 @router.post("/resend-verification")
-async def resend_verification(email: str, db: Session = Depends(get_db)):
+async def resend_verification(email: str, db: AsyncSession = Depends(get_async_db)):
     """Resend email verification"""
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -226,9 +227,9 @@ async def resend_verification(email: str, db: Session = Depends(get_db)):
         expires_at=datetime.utcnow() + timedelta(hours=24)
     )
     db.add(token_record)
-    db.commit()
+    await db.commit()
     
-    # Send email
+    # Queue email for delivery
     email_service.send_verification_email(
         user.email, 
         verification_token, 
@@ -238,9 +239,9 @@ async def resend_verification(email: str, db: Session = Depends(get_db)):
     return {"message": "Verification email sent successfully"}
 
 @router.post("/forgot-password")
-async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     """Send password reset email"""
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     if not user:
         # Don't reveal if user exists or not
         return {"message": "If the email exists, a password reset link has been sent"}
@@ -253,9 +254,9 @@ async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(
         expires_at=datetime.utcnow() + timedelta(hours=1)
     )
     db.add(token_record)
-    db.commit()
+    await db.commit()
     
-    # Send email
+    # Queue email for delivery
     email_service.send_password_reset_email(
         user.email, 
         reset_token, 
@@ -265,14 +266,14 @@ async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(
     return {"message": "If the email exists, a password reset link has been sent"}
 
 @router.post("/reset-password")
-async def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     """Reset password using token"""
     # Find reset token
-    token_record = db.query(PasswordResetToken).filter(
+    token_record = await db.scalar(select(PasswordResetToken).where(
         PasswordResetToken.token == request.token,
         PasswordResetToken.is_used == False,
         PasswordResetToken.expires_at > datetime.utcnow()
-    ).first()
+    ))
     
     if not token_record:
         raise HTTPException(
@@ -281,7 +282,7 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
         )
     
     # Get user
-    user = db.query(User).filter(User.id == token_record.user_id).first()
+    user = await db.scalar(select(User).where(User.id == token_record.user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -292,12 +293,12 @@ async def reset_password(request: ResetPasswordRequest, db: Session = Depends(ge
     user.password_hash = get_password_hash(request.new_password)
     user.failed_login_attempts = 0
     token_record.is_used = True
-    db.commit()
+    await db.commit()
     
     return {"message": "Password reset successfully"}
 
 @router.post("/refresh")
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token using refresh token"""
     try:
         # Verify refresh token
@@ -311,11 +312,11 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
             )
         
         # Check if refresh token exists in database
-        session = db.query(UserSession).filter(
+        session = await db.scalar(select(UserSession).where(
             UserSession.refresh_token == refresh_token,
             UserSession.is_revoked == False,
             UserSession.expires_at > datetime.utcnow()
-        ).first()
+        ))
         
         if not session:
             raise HTTPException(
@@ -335,17 +336,17 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
         )
 
 @router.post("/logout")
-async def logout(token: str = Depends(security), db: Session = Depends(get_db)):
+async def logout(token: str = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """Logout user by revoking refresh token"""
     try:
         # Find and revoke refresh token
-        session = db.query(UserSession).filter(
+        session = await db.scalar(select(UserSession).where(
             UserSession.refresh_token == token.credentials
-        ).first()
+        ))
         
         if session:
             session.is_revoked = True
-            db.commit()
+            await db.commit()
         
         return {"message": "Logged out successfully"}
         
@@ -356,16 +357,27 @@ async def logout(token: str = Depends(security), db: Session = Depends(get_db)):
         )
 
 @router.get("/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get current user information"""
+    # The cached snapshot only carries authorization fields
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
     return {
-        "id": str(current_user.id),
-        "email": current_user.email,
-        "firstName": current_user.email.split('@')[0].title(),
+        "id": str(user.id),
+        "email": user.email,
+        "firstName": user.email.split('@')[0].title(),
         "lastName": "",
-        "role": current_user.role,
-        "is_active": current_user.is_active,
-        "status": "active" if current_user.is_active else "inactive",
-        "createdAt": current_user.created_at.isoformat(),
-        "updatedAt": current_user.created_at.isoformat()
+        "role": user.role,
+        "is_active": user.is_active,
+        "status": "active" if user.is_active else "inactive",
+        "createdAt": user.created_at.isoformat(),
+        "updatedAt": user.created_at.isoformat()
     }
@@ -9,6 +9,8 @@ import time
 
 from app.core.database import get_db
 from app.services.cache_service import cache_service
+from app.api.deps import user_snapshot_cache
+from app.core.privacy import privacy_settings_cache, team_acl_cache
 
 router = APIRouter()
 
@@ -98,7 +100,10 @@ async def cache_statistics():
         
         return {
             "timestamp": datetime.utcnow().isoformat(),
-            "cache_stats": stats
+            "cache_stats": stats,
+            "user_snapshot_cache": user_snapshot_cache.stats(),
+            "privacy_settings_cache": privacy_settings_cache.stats(),
+            "team_acl_cache": team_acl_cache.stats()
         }
         
     except Exception as e:
@@ -1,20 +1,121 @@
 """
 Survey management endpoints for FastAPI
 """
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
-from app.models.base import Survey, Question, User, Response, Answer
-from app.models.responses import NumericResponse, Comment
-from app.api.deps import get_current_user
-from app.core.token_validation import validate_survey_token, mark_token_used, get_device_fingerprint
+from app.core.database import get_async_db
+from app.models.base import Survey, Question, Answer, FileAttachment, Response
+from app.api.deps import UserSnapshot, get_current_user
+from app.core.token_validation import get_device_fingerprint
+from app.services.submission_service import SubmissionService
 
 router = APIRouter()
 
+def survey_relationships() -> tuple:
+    """Eager loads for what Survey.to_dict() walks; lazy loads fail on an AsyncSession
+
+    Used where a write needs the ORM object anyway; read-only endpoints use
+    fetch_survey_dicts. Questions and attachments come in one extra query
+    each; the response count rides along as a subquery.
+    """
+    return (
+        selectinload(Survey.questions),
+        selectinload(Survey.attachments),
+        undefer(Survey.response_count),
+    )
+
+# Read endpoints serialize straight from rows: no ORM objects are hydrated,
+# and a listing costs three queries however many surveys it returns
+surveys_table = Survey.__table__
+questions_table = Question.__table__
+attachments_table = FileAttachment.__table__
+responses_table = Response.__table__
+
+QUESTION_FIELDS = ('id', 'survey_id', 'text', 'type', 'required', 'order', 'options', 'allow_comments')
+ATTACHMENT_FIELDS = (
+    'id', 'survey_id', 'filename', 'original_filename', 'file_size',
+    'mime_type', 'uploaded_by', 'uploaded_at', 'description'
+)
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+async def fetch_survey_dicts(db: AsyncSession, *criteria, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """
+    Surveys matching criteria (on surveys_table columns), shaped like Survey.to_dict()
+    
+    One query for the surveys with their response counts, then one each for
+    the questions and attachments of every survey returned.
+    """
+    response_count = (
+        select(func.count(responses_table.c.id))
+        .where(responses_table.c.survey_id == surveys_table.c.id)
+        .scalar_subquery()
+        .label('response_count')
+    )
+    query = select(surveys_table, response_count).where(*criteria).order_by(surveys_table.c.id).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = (await db.execute(query)).mappings().all()
+    if not rows:
+        return []
+    
+    survey_ids = [row['id'] for row in rows]
+    questions = {survey_id: [] for survey_id in survey_ids}
+    for question in (await db.execute(
+        select(*(questions_table.c[field] for field in QUESTION_FIELDS))
+        .where(questions_table.c.survey_id.in_(survey_ids))
+        .order_by(questions_table.c.survey_id, questions_table.c.order, questions_table.c.id)
+    )).mappings():
+        questions[question['survey_id']].append(dict(question))
+    
+    attachments = {survey_id: [] for survey_id in survey_ids}
+    for attachment in (await db.execute(
+        select(*(attachments_table.c[field] for field in ATTACHMENT_FIELDS))
+        .where(attachments_table.c.survey_id.in_(survey_ids))
+        .order_by(attachments_table.c.survey_id, attachments_table.c.id)
+    )).mappings():
+        attachment = dict(attachment)
+        attachment['uploaded_at'] = _isoformat(attachment['uploaded_at'])
+        attachments[attachment['survey_id']].append(attachment)
+    
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'creator_id': row['creator_id'],
+            'status': row['status'],
+            'start_date': _isoformat(row['start_date']),
+            'end_date': _isoformat(row['end_date']),
+            'is_anonymous': row['is_anonymous'],
+            'allow_comments': row['allow_comments'],
+            'reminder_frequency': row['reminder_frequency'],
+            'category': row['category'],
+            'created_at': _isoformat(row['created_at']),
+            'updated_at': _isoformat(row['updated_at']),
+            'questions': questions[row['id']],
+            'response_count': row['response_count'],
+            'attachments': attachments[row['id']]
+        }
+        for row in rows
+    ]
+
+async def load_survey(db: AsyncSession, *criteria) -> Optional[Survey]:
+    """Load one survey with the relationships to_dict() needs"""
+    return await db.scalar(
+        select(Survey)
+        .options(*survey_relationships())
+        .where(*criteria)
+        .execution_options(populate_existing=True)
+    )
+
 class QuestionCreate(BaseModel):
     text: str
     type: str  # text, multiple_choice, rating, etc.
@@ -76,21 +177,22 @@ class ResponseSubmit(BaseModel):
 async def get_surveys(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get all surveys for the current user"""
-    surveys = db.query(Survey).filter(
-        Survey.creator_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    
-    return [survey.to_dict() for survey in surveys]
+    return await fetch_survey_dicts(
+        db,
+        surveys_table.c.creator_id == current_user.id,
+        offset=skip,
+        limit=limit
+    )
 
 @router.post("/", response_model=SurveyResponse)
 async def create_survey(
     survey_data: SurveyCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Create a new survey"""
     # Create survey
@@ -106,8 +208,7 @@ async def create_survey(
     )
     
     db.add(survey)
-    db.commit()
-    db.refresh(survey)
+    await db.flush()
     
     # Create questions
     for i, question_data in enumerate(survey_data.questions):
@@ -122,60 +223,47 @@ async def create_survey(
         )
         db.add(question)
     
-    db.commit()
-    db.refresh(survey)
+    await db.commit()
+    survey = await load_survey(db, Survey.id == survey.id)
     
     return survey.to_dict()
 
 @router.get("/{survey_id}", response_model=SurveyResponse)
 async def get_survey(
     survey_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Get a specific survey by ID"""
-    survey = db.query(Survey).filter(
-        Survey.id == survey_id,
-        Survey.creator_id == current_user.id
-    ).first()
+    surveys = await fetch_survey_dicts(
+        db,
+        surveys_table.c.id == survey_id,
+        surveys_table.c.creator_id == current_user.id
+    )
     
-    if not survey:
+    if not surveys:
         raise HTTPException(status_code=404, detail="Survey not found")
     
-    # Get questions for the survey
-    questions = db.query(Question).filter(
-        Question.survey_id == survey_id
-    ).order_by(Question.order).all()
-    
-    # Get response count
-    response_count = db.query(Response).filter(
-        Response.survey_id == survey_id
-    ).count()
-    
-    survey_dict = survey.to_dict()
-    survey_dict['questions'] = [question.to_dict() for question in questions]
-    survey_dict['response_count'] = response_count
-    
-    return survey_dict
+    return surveys[0]
 
 @router.get("/{survey_id}/public")
 async def get_survey_public(
     survey_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a survey for public response (no authentication required)"""
-    survey = db.query(Survey).filter(
+    survey = await db.scalar(select(Survey).where(
         Survey.id == survey_id,
         Survey.status == "active"  # Only active surveys can be responded to
-    ).first()
+    ))
     
     if not survey:
         raise HTTPException(status_code=404, detail="Survey not found or not active")
     
     # Get questions for the survey
-    questions = db.query(Question).filter(
-        Question.survey_id == survey_id
-    ).order_by(Question.order).all()
+    questions = (await db.scalars(
+        select(Question).where(Question.survey_id == survey_id).order_by(Question.order)
+    )).all()
     
     return {
         "id": survey.id,
@@ -190,18 +278,10 @@ async def get_survey_public(
 async def submit_survey_response(
     survey_id: str,
     response_data: ResponseSubmit,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit a survey response with token validation"""
-    # Check if survey exists and is active
-    survey = db.query(Survey).filter(
-        Survey.id == survey_id,
-        Survey.status == "active"
-    ).first()
-    
-    if not survey:
-        raise HTTPException(status_code=404, detail="Survey not found or not active")
-    
     # Token validation (required for anonymous responses)
     if not response_data.token:
         raise HTTPException(
@@ -209,45 +289,33 @@ async def submit_survey_response(
             detail="Survey token is required for anonymous responses"
         )
     
-    # Validate token and get team_id (without exposing employee_id)
-    team_id = validate_survey_token(response_data.token, survey_id, db, request)
-    
-    # Mark token as used (single-use enforcement)
-    mark_token_used(response_data.token, db)
-    
-    # Store numeric responses (0-10 scores)
-    for answer_data in response_data.answers:
-        if answer_data.question_id:  # Assuming question_id maps to driver_id
-            numeric_response = NumericResponse(
-                survey_id=survey_id,
-                team_id=team_id,
-                driver_id=str(answer_data.question_id),  # Map question_id to driver_id
-                score=int(answer_data.value) if answer_data.value.isdigit() else 0
-            )
-            db.add(numeric_response)
-    
-    # Store comments (if any)
-    if response_data.comment:
-        comment = Comment(
-            survey_id=survey_id,
-            team_id=team_id,
-            driver_id=None,  # General comment
-            text=response_data.comment
-        )
-        db.add(comment)
-    
-    db.commit()
+    device_fingerprint = get_device_fingerprint(request)
+    
+    # Claim the token and store the numeric responses (0-10 scores) in one
+    # transaction; question_id maps to driver_id
+    result = await SubmissionService(db).submit(
+        survey_id,
+        response_data.token,
+        scores=[
+            (str(answer_data.question_id), int(answer_data.value) if answer_data.value.isdigit() else 0)
+            for answer_data in response_data.answers
+            if answer_data.question_id
+        ],
+        comment=response_data.comment,
+        device_fingerprint=device_fingerprint
+    )
+    team_id = result.team_id
     
-    # Log survey submission
+    # Log survey submission (queued; written in batches off the request path)
     from app.services.audit_service import AuditService
-    audit_service = AuditService(db)
-    audit_service.log_survey_submission(
+    AuditService().log_survey_submission(
         survey_id=survey_id,
-        team_id=team_id,
-        token=response_data.token,
-        ip_address=request.client.host if request else None,
-        user_agent=request.headers.get("user-agent") if request else None,
-        device_fingerprint=get_device_fingerprint(request) if request else None
+        details={
+            "team_id": team_id,
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+            "device_fingerprint": device_fingerprint
+        }
     )
     
     # Trigger real-time background tasks
@@ -262,37 +330,37 @@ async def submit_survey_response(
     update_running_counters.delay(survey_id, team_id)
     
     # Process comments if any
-    if response_data.comment:
+    if result.comment_id:
         # Queue individual comment for NLP processing
         from app.tasks.nlp_tasks import queue_comment_for_processing
-        queue_comment_for_processing.delay(str(comment.id))
+        queue_comment_for_processing.delay(result.comment_id)
         process_new_comments.delay(survey_id, team_id)
     
     # Compute trends (less frequent)
     compute_trends.delay(survey_id, team_id)
     
     # Evaluate alerts
-    survey_creator = db.query(Survey).filter(Survey.id == survey_id).first()
-    if survey_creator:
-        evaluate_survey_alerts.delay(survey_id, team_id, survey_creator.creator_id)
+    if result.creator_id is not None:
+        evaluate_survey_alerts.delay(survey_id, team_id, result.creator_id)
     
     return {
         "message": "Response submitted successfully",
-        "response_id": response.id
+        "responses_recorded": result.scores_recorded
     }
 
 @router.put("/{survey_id}", response_model=SurveyResponse)
 async def update_survey(
     survey_id: int,
     survey_data: SurveyUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Update a survey"""
-    survey = db.query(Survey).filter(
+    survey = await load_survey(
+        db,
         Survey.id == survey_id,
         Survey.creator_id == current_user.id
-    ).first()
+    )
     
     if not survey:
         raise HTTPException(
@@ -306,22 +374,23 @@ async def update_survey(
         setattr(survey, field, value)
     
     survey.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(survey)
+    await db.commit()
     
     return survey.to_dict()
 
 @router.delete("/{survey_id}")
 async def delete_survey(
     survey_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Delete a survey"""
-    survey = db.query(Survey).filter(
+    # Relationships are loaded up front so the delete cascade can walk them
+    survey = await load_survey(
+        db,
         Survey.id == survey_id,
         Survey.creator_id == current_user.id
-    ).first()
+    )
     
     if not survey:
         raise HTTPException(
@@ -329,22 +398,22 @@ async def delete_survey(
             detail="Survey not found"
         )
     
-    db.delete(survey)
-    db.commit()
+    await db.delete(survey)
+    await db.commit()
     
     return {"message": f"Survey {survey_id} deleted successfully"}
 
 @router.post("/{survey_id}/activate")
 async def activate_survey(
     survey_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Activate a survey (change status from draft to active)"""
-    survey = db.query(Survey).filter(
+    survey = await db.scalar(select(Survey).where(
         Survey.id == survey_id,
         Survey.creator_id == current_user.id
-    ).first()
+    ))
     
     if not survey:
         raise HTTPException(
@@ -361,21 +430,21 @@ async def activate_survey(
     survey.status = "active"
     survey.start_date = datetime.utcnow()
     survey.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return {"message": f"Survey {survey_id} activated successfully"}
 
 @router.post("/{survey_id}/close")
 async def close_survey(
     survey_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Close a survey and auto-expire unused tokens"""
-    survey = db.query(Survey).filter(
+    survey = await db.scalar(select(Survey).where(
         Survey.id == survey_id,
         Survey.creator_id == current_user.id
-    ).first()
+    ))
     
     if not survey:
         raise HTTPException(
@@ -392,7 +461,7 @@ async def close_survey(
     survey.status = "closed"
     survey.end_date = datetime.utcnow()
     survey.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Auto-expire unused tokens
     from app.tasks.nlp_tasks import auto_expire_survey_tokens
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models.base import User, Survey, Response
-from app.api.deps import get_current_user
+from app.models.base import Survey, Response
+from app.api.deps import UserSnapshot, get_current_user
 from pydantic import BaseModel
 from typing import List, Optional
 import secrets
@@ -25,7 +26,7 @@ class SurveyResponse(BaseModel):
 @router.get("/surveys/user/{user_id}")
 async def get_user_surveys(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all surveys for a specific user"""
@@ -52,7 +53,7 @@ async def get_user_surveys(
 @router.post("/surveys/{survey_id}/generate-token")
 async def generate_survey_token(
     survey_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Generate a unique token for a user's survey"""
@@ -151,12 +152,21 @@ async def submit_survey_response(
         if existing_response:
             raise HTTPException(status_code=400, detail="Response already submitted")
         
-        # Check submission limit based on company size
-        current_submissions = db.query(Response).filter(
-            Response.survey_id == survey_id
-        ).count()
+        # Check the submission limit and count this submission in one statement;
+        # the row lock makes concurrent submitters queue behind each other.
+        # A NULL max_submissions means no limit
+        claimed = db.execute(
+            update(Survey)
+            .where(
+                Survey.id == survey_id,
+                or_(Survey.max_submissions.is_(None), Survey.current_submissions < Survey.max_submissions)
+            )
+            .values(current_submissions=Survey.current_submissions + 1)
+            .returning(Survey.current_submissions)
+        ).scalar_one_or_none()
         
-        if current_submissions >= survey.max_submissions:
+        if claimed is None:
+            db.rollback()
             raise HTTPException(
                 status_code=429, 
                 detail=f"Survey is closed. Maximum submissions ({survey.max_submissions}) reached for company size of {survey.company_size} employees."
@@ -0,0 +1,272 @@
+"""
+Buffered audit log sink
+
+Audit events are queued in memory and written in batches by a background
+thread, so recording one costs a queue put on the request path. Batches go
+to the audit_logs table or to an append-only JSON-lines file.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.base import AuditLog
+
+logger = logging.getLogger(__name__)
+
+audit_logs = AuditLog.__table__
+
+# Queue markers: _FLUSH asks the writer to write what it holds now, _STOP
+# to write everything and exit
+_FLUSH = object()
+_STOP = object()
+
+class DatabaseAuditWriter:
+    """Writes batches to audit_logs with one executemany INSERT"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._table_ready = False
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        if not self._table_ready:
+            audit_logs.create(self.engine, checkfirst=True)
+            self._table_ready = True
+        with self.engine.begin() as conn:
+            conn.execute(insert(audit_logs), events)
+
+class FileAuditWriter:
+    """Appends batches to a JSON-lines file, synced to disk per batch"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(event, default=str, separators=(",", ":")) + "\n" for event in events)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+class AuditSink:
+    """Bounded in-memory queue drained in batches by a writer thread
+
+    A batch is written once batch_size events are waiting or the oldest has
+    waited flush_interval seconds. When the queue is full, enqueue blocks for
+    at most enqueue_timeout and then drops the event and counts it. Failed
+    writes are retried with backoff, so an event may be written twice but is
+    not lost while the process lives. close() drains the queue, and batches
+    the writer still rejects at shutdown go to fallback_writer if one is set.
+    """
+
+    def __init__(
+        self,
+        writer,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        enqueue_timeout: float = 0.0,
+        fallback_writer=None,
+        max_retry_delay: float = 30.0,
+        shutdown_attempts: int = 3
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.fallback_writer = fallback_writer
+        self.max_retry_delay = max_retry_delay
+        self.shutdown_attempts = shutdown_attempts
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closing = False
+        self._closed = False
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed_writes": 0, "lost": 0}
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for writing; False if it was dropped"""
+        if self._closing:
+            self._count("dropped")
+            logger.warning(f"Audit sink closed, dropped {event.get('action')} event")
+            return False
+        self._ensure_started()
+
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(event, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+        self._count("enqueued")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; False if it did not finish in time"""
+        if self._thread is None or self._closed:
+            return self._queue.unfinished_tasks == 0
+        try:
+            self._queue.put(_FLUSH, timeout=timeout)
+        except queue.Full:
+            return False
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop accepting events, write everything queued and stop the writer"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+        if self._thread is None:
+            self._closed = True
+            return
+
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error(f"Audit sink did not drain before shutdown, {self._queue.qsize()} events unwritten")
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Audit sink did not drain before shutdown, {self._queue.qsize()} events unwritten")
+        self._closed = True
+
+    def stats(self) -> Dict[str, int]:
+        """Event counters and current queue depth"""
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        markers = 0
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+                markers += 1
+                # Events that raced past the closing check land behind _STOP
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _FLUSH or item is _STOP:
+                        markers += 1
+                    else:
+                        batch.append(item)
+            elif item is _FLUSH:
+                markers += 1
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            elif not batch:
+                deadline = None
+                continue
+
+            for start in range(0, len(batch), self.batch_size):
+                chunk = batch[start:start + self.batch_size]
+                self._write(chunk)
+                for _ in chunk:
+                    self._queue.task_done()
+            for _ in range(markers):
+                self._queue.task_done()
+            batch = []
+            markers = 0
+            deadline = None
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, retrying until it lands or shutdown gives up"""
+        delay = 0.5
+        attempts = 0
+        while True:
+            try:
+                self.writer.write(batch)
+                self._count("written", len(batch))
+                return
+            except Exception as e:
+                attempts += 1
+                self._count("failed_writes")
+                logger.error(f"Error writing {len(batch)} audit events (attempt {attempts}): {str(e)}")
+
+            if self._closing and attempts >= self.shutdown_attempts:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+        if self.fallback_writer is not None:
+            try:
+                self.fallback_writer.write(batch)
+                self._count("written", len(batch))
+                logger.warning(f"Wrote {len(batch)} audit events to the fallback writer at shutdown")
+                return
+            except Exception as e:
+                logger.error(f"Error writing audit events to the fallback writer: {str(e)}")
+        self._count("lost", len(batch))
+        logger.error(f"Lost {len(batch)} audit events at shutdown")
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+def get_audit_sink() -> AuditSink:
+    """Process-wide sink on the backend chosen by AUDIT_LOG_BACKEND"""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                file_writer = FileAuditWriter(settings.AUDIT_LOG_FILE)
+                if settings.AUDIT_LOG_BACKEND == "file":
+                    writer, fallback = file_writer, None
+                else:
+                    from app.core.database import engine
+
+                    writer, fallback = DatabaseAuditWriter(engine), file_writer
+                _sink = AuditSink(
+                    writer,
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+                    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+                    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+                    fallback_writer=fallback
+                )
+                atexit.register(_sink.close)
+    return _sink
+
+def shutdown_audit_sink(timeout: Optional[float] = 10.0) -> None:
+    """Drain and stop the process-wide sink, if one was started"""
+    if _sink is not None:
+        _sink.close(timeout)
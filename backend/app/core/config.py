@@ -62,6 +62,15 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USERNAME: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
+    SMTP_USE_TLS: bool = True  # STARTTLS before LOGIN
+    SMTP_TIMEOUT_SECONDS: float = 30
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Reconnect after this many messages
+    EMAIL_WORKERS: int = 4  # Delivery threads, each with its own SMTP connection
+    EMAIL_OUTBOX_MAX_SIZE: int = 10000  # Queued messages before enqueue applies backpressure
+    EMAIL_ENQUEUE_TIMEOUT_SECONDS: float = 0.0  # How long enqueue may block on a full outbox
+    EMAIL_MAX_ATTEMPTS: int = 4  # Delivery attempts for transient SMTP failures
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 1.0  # Doubles after each failed attempt
+    EMAIL_IDLE_TIMEOUT_SECONDS: float = 60  # Idle workers close their connection after this
     
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -70,6 +79,29 @@ class Settings(BaseSettings):
     # Cache Configuration
     CACHE_TTL: int = 3600  # 1 hour default cache TTL
     CACHE_PREFIX: str = "novora"
+    USER_CACHE_TTL_SECONDS: int = 60  # Authenticated-user snapshot lifetime
+    USER_CACHE_MAX_SIZE: int = 10000
+    PRIVACY_CACHE_TTL_SECONDS: int = 300  # Org privacy rules lifetime
+    PRIVACY_CACHE_MAX_SIZE: int = 1000
+    TEAM_ACL_CACHE_TTL_SECONDS: int = 300  # Manager team-membership lifetime
+    TEAM_ACL_CACHE_MAX_SIZE: int = 10000
+    COMMENT_COUNT_CACHE_TTL_SECONDS: int = 300  # Per-(survey, team) comment counts for min-n
+    COMMENT_COUNT_CACHE_MAX_SIZE: int = 10000
+    
+    # Survey-link abuse throttling
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per process) or redis (shared)
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    
+    # Invitation token minting
+    INVITE_TOKEN_CHUNK_SIZE: int = 10000  # Tokens generated and written per round trip
+    
+    # Audit log sink
+    AUDIT_LOG_BACKEND: str = "database"  # database (audit_logs table) or file (append-only JSON lines)
+    AUDIT_LOG_FILE: str = "audit.log.jsonl"
+    AUDIT_BATCH_SIZE: int = 500  # Events per flush
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0  # Longest an event waits in memory
+    AUDIT_QUEUE_MAX_SIZE: int = 10000  # Buffered events before enqueue applies backpressure
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.0  # How long enqueue may block on a full queue before dropping
     
     # Auto-Pilot Configuration
     AUTO_PILOT_CHECK_INTERVAL: int = 300  # 5 minutes
@@ -127,6 +159,15 @@ class Settings(BaseSettings):
             # Development: Use SQLite
             return self.DATABASE_URL
     
+    def get_async_database_url(self) -> str:
+        """Get the database URL with an asyncio driver (asyncpg / aiosqlite)"""
+        url = self.get_database_url()
+        if url.startswith("sqlite:"):
+            return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+        if url.startswith(("postgresql:", "postgres:")):
+            return "postgresql+asyncpg:" + url.split(":", 1)[1]
+        return url
+    
     def get_redis_url(self) -> str:
         """Get Redis URL with authentication if provided"""
         if self.REDIS_PASSWORD:
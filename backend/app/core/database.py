@@ -2,6 +2,7 @@
 Database configuration for FastAPI application
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import QueuePool
 from app.core.config import settings
@@ -37,6 +38,30 @@ else:
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for endpoints that must not block the event loop
+# (asyncpg in production, aiosqlite in development)
+ASYNC_DATABASE_URL = settings.get_async_database_url()
+
+if settings.is_production:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=20,
+        max_overflow=30,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.DEBUG,
+    )
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=settings.DEBUG,
+    )
+
+# Objects stay readable after commit; async sessions cannot lazy-refresh them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -73,17 +98,58 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
     """Initialize database tables"""
     try:
         from app.models.base import User, Survey, Question, Response, Answer, SurveyTemplate, EmailVerificationToken, PasswordResetToken, UserSession, FileAttachment
         from app.models.advanced import Department, Team, UserDepartment, UserTeam, AnonymousComment, CommentAction, SurveyBranching, Permission, Role, RolePermission, UserRole, BrandingConfig, SSOConfig, APIKey, Webhook, SurveySchedule, DashboardAlert, TeamAnalytics, Metric, QuestionBank, AutoPilotPlan, AutoPilotSurvey
         Base.metadata.create_all(bind=engine)
+        ensure_submission_counter()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+def ensure_submission_counter(bind=None) -> bool:
+    """
+    Add surveys.current_submissions to an existing table, seeded from stored responses
+    
+    create_all never alters existing tables, and a counter starting at 0 would
+    let a survey that is already full accept another max_submissions responses.
+    Returns True if the column was added.
+    """
+    from sqlalchemy import inspect, text
+    bind = bind or engine
+    inspector = inspect(bind)
+    if not inspector.has_table("surveys"):
+        return False
+    if any(column["name"] == "current_submissions" for column in inspector.get_columns("surveys")):
+        return False
+    
+    try:
+        with bind.begin() as connection:
+            connection.execute(text("ALTER TABLE surveys ADD COLUMN current_submissions INTEGER NOT NULL DEFAULT 0"))
+            if inspector.has_table("responses"):
+                connection.execute(text("""
+                    UPDATE surveys SET current_submissions = (
+                        SELECT COUNT(*) FROM responses WHERE responses.survey_id = surveys.id
+                    )
+                """))
+    except Exception as e:
+        # Another worker may have added (and seeded) it first
+        if any(column["name"] == "current_submissions" for column in inspect(bind).get_columns("surveys")):
+            return False
+        logger.error(f"Failed to add submission counter: {e}")
+        raise
+    
+    logger.info("Added surveys.current_submissions and seeded it from stored responses")
+    return True
+
 def check_database_connection():
     """Check if database connection is working"""
     try:
@@ -3,7 +3,7 @@ Dependencies for FastAPI application
 """
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 
-# Re-export get_db for convenience
-__all__ = ["get_db"]
+# Re-export the session dependencies for convenience
+__all__ = ["get_db", "get_async_db"]
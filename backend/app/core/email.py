@@ -1,23 +1,249 @@
 """
 Email service for notifications and verification
 """
+import atexit
+import logging
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
-import os
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+def is_transient_smtp_error(error: Exception) -> bool:
+    """True for failures worth retrying: 4xx replies, dropped or refused connections"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+class SMTPConnection:
+    """One SMTP session reused across messages
+
+    Connects (and does STARTTLS and LOGIN) on first use, reconnects once if
+    a reused session turns out to have been dropped by the server, and
+    starts a fresh session after max_messages.
+    """
+    
+    def __init__(
+        self,
+        server: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        timeout: float = 30,
+        max_messages: int = 100
+    ):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._sent = 0
+    
+    def send(self, message) -> None:
+        if self._smtp is not None and self._sent >= self.max_messages:
+            self.close()
+        
+        reused = self._smtp is not None
+        if not reused:
+            self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._connect()
+            self._smtp.send_message(message)
+        self._sent += 1
+    
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+    
+    def _connect(self) -> None:
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._sent = 0
+
+class EmailOutbox:
+    """Bounded queue of outgoing messages drained by a pool of workers
+
+    Each worker holds its own SMTPConnection, so a blast of invitations
+    pays for connect, STARTTLS and LOGIN once per worker rather than once
+    per message. Transient failures are retried with exponential backoff;
+    permanent ones are logged and dropped. When the queue is full, enqueue
+    waits at most enqueue_timeout and then refuses the message.
+    """
+    
+    def __init__(
+        self,
+        connection_factory: Callable[[], SMTPConnection],
+        workers: int = 4,
+        max_size: int = 10000,
+        enqueue_timeout: float = 0.0,
+        max_attempts: int = 4,
+        retry_backoff: float = 1.0,
+        idle_timeout: float = 60
+    ):
+        self.connection_factory = connection_factory
+        self.workers = workers
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closing = False
+        self._stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "rejected": 0}
+    
+    def enqueue(self, message) -> bool:
+        """Queue a message for delivery; False if the outbox refused it"""
+        if self._closing:
+            self._count("rejected")
+            return False
+        self._ensure_started()
+        
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(message, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(message)
+        except queue.Full:
+            self._count("rejected")
+            logger.warning(f"Email outbox full, refused message to {message['To']}")
+            return False
+        
+        self._count("queued")
+        return True
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message was delivered or given up on"""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+    
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Stop accepting messages, deliver what is queued and stop the workers"""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                self._queue.put(_STOP, timeout=remaining)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        
+        unsent = self._queue.qsize()
+        if any(thread.is_alive() for thread in self._threads) and unsent:
+            logger.error(f"Email outbox did not drain before shutdown, {unsent} messages unsent")
+    
+    def stats(self) -> Dict[str, int]:
+        """Delivery counters and current queue depth"""
+        with self._lock:
+            return {**self._stats, "pending": self._queue.qsize()}
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+    
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                self._threads = [
+                    threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+    
+    def _run(self) -> None:
+        connection = self.connection_factory()
+        try:
+            while True:
+                try:
+                    message = self._queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    # Do not hold a server slot while nothing is being sent
+                    connection.close()
+                    continue
+                
+                if message is _STOP:
+                    self._queue.task_done()
+                    return
+                try:
+                    self._deliver(connection, message)
+                finally:
+                    self._queue.task_done()
+        finally:
+            connection.close()
+    
+    def _deliver(self, connection: SMTPConnection, message) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                connection.send(message)
+                self._count("sent")
+                return
+            except Exception as e:
+                connection.close()
+                if not is_transient_smtp_error(e) or attempt == self.max_attempts:
+                    self._count("failed")
+                    logger.error(f"Failed to send email to {message['To']} after {attempt} attempts: {str(e)}")
+                    return
+                self._count("retried")
+                logger.warning(f"Retrying email to {message['To']} (attempt {attempt}): {str(e)}")
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
 class EmailService:
     def __init__(self):
         self.smtp_server = settings.SMTP_SERVER
         self.smtp_port = settings.SMTP_PORT
         self.smtp_username = settings.SMTP_USERNAME
         self.smtp_password = settings.SMTP_PASSWORD
+        self._outbox: Optional[EmailOutbox] = None
+        self._outbox_lock = threading.Lock()
         
     def is_configured(self) -> bool:
         """Check if email is properly configured"""
@@ -27,6 +253,76 @@ class EmailService:
             self.smtp_password
         ])
     
+    def create_connection(self) -> SMTPConnection:
+        """A new reusable SMTP session with the configured server"""
+        return SMTPConnection(
+            self.smtp_server,
+            self.smtp_port,
+            self.smtp_username,
+            self.smtp_password,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        )
+    
+    @property
+    def outbox(self) -> EmailOutbox:
+        """Process-wide outbox, started on first use"""
+        if self._outbox is None:
+            with self._outbox_lock:
+                if self._outbox is None:
+                    self._outbox = EmailOutbox(
+                        self.create_connection,
+                        workers=settings.EMAIL_WORKERS,
+                        max_size=settings.EMAIL_OUTBOX_MAX_SIZE,
+                        enqueue_timeout=settings.EMAIL_ENQUEUE_TIMEOUT_SECONDS,
+                        max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+                        retry_backoff=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+                        idle_timeout=settings.EMAIL_IDLE_TIMEOUT_SECONDS
+                    )
+                    atexit.register(self._outbox.close)
+        return self._outbox
+    
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        attachments: Optional[List[Path]] = None
+    ) -> MIMEMultipart:
+        """Build a MIME message from the configured sender"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.smtp_username
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add text content
+        if text_content:
+            text_part = MIMEText(text_content, 'plain')
+            msg.attach(text_part)
+        
+        # Add HTML content
+        html_part = MIMEText(html_content, 'html')
+        msg.attach(html_part)
+        
+        # Add attachments
+        if attachments:
+            for attachment_path in attachments:
+                if attachment_path.exists():
+                    with open(attachment_path, "rb") as attachment:
+                        part = MIMEBase('application', 'octet-stream')
+                        part.set_payload(attachment.read())
+                    
+                    encoders.encode_base64(part)
+                    part.add_header(
+                        'Content-Disposition',
+                        f'attachment; filename= {attachment_path.name}'
+                    )
+                    msg.attach(part)
+        
+        return msg
+    
     def send_email(
         self,
         to_email: str,
@@ -35,56 +331,49 @@ class EmailService:
         text_content: Optional[str] = None,
         attachments: Optional[List[Path]] = None
     ) -> bool:
-        """Send an email"""
+        """Send an email now, on a connection of its own"""
         if not self.is_configured():
-            print(f"Email not configured. Would send to {to_email}: {subject}")
+            logger.info(f"Email not configured. Would send to {to_email}: {subject}")
             return False
         
+        connection = self.create_connection()
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.smtp_username
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add text content
-            if text_content:
-                text_part = MIMEText(text_content, 'plain')
-                msg.attach(text_part)
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Add attachments
-            if attachments:
-                for attachment_path in attachments:
-                    if attachment_path.exists():
-                        with open(attachment_path, "rb") as attachment:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(attachment.read())
-                        
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {attachment_path.name}'
-                        )
-                        msg.attach(part)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
+            connection.send(self.build_message(to_email, subject, html_content, text_content, attachments))
             return True
             
         except Exception as e:
-            print(f"Failed to send email to {to_email}: {str(e)}")
+            logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
+        finally:
+            connection.close()
+    
+    def queue_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        attachments: Optional[List[Path]] = None
+    ) -> bool:
+        """Queue an email for background delivery; False if it was not queued"""
+        if not self.is_configured():
+            logger.info(f"Email not configured. Would send to {to_email}: {subject}")
+            return False
+        
+        try:
+            message = self.build_message(to_email, subject, html_content, text_content, attachments)
+        except Exception as e:
+            logger.error(f"Failed to build email to {to_email}: {str(e)}")
+            return False
+        return self.outbox.enqueue(message)
+    
+    def shutdown(self, timeout: Optional[float] = 30.0) -> None:
+        """Deliver queued email and stop the workers, if they were started"""
+        if self._outbox is not None:
+            self._outbox.close(timeout)
     
     def send_verification_email(self, to_email: str, token: str, user_name: str) -> bool:
-        """Send email verification email"""
+        """Queue email verification email"""
         subject = "Verify your Novora account"
         
         verification_url = f"https://novorasurveys.com/verify-email?token={token}"
@@ -119,10 +408,10 @@ class EmailService:
         The Novora Team
         """
         
-        return self.send_email(to_email, subject, html_content, text_content)
+        return self.queue_email(to_email, subject, html_content, text_content)
     
     def send_password_reset_email(self, to_email: str, token: str, user_name: str) -> bool:
-        """Send password reset email"""
+        """Queue password reset email"""
         subject = "Reset your Novora password"
         
         reset_url = f"https://novorasurveys.com/reset-password?token={token}"
@@ -160,7 +449,7 @@ class EmailService:
         The Novora Team
         """
         
-        return self.send_email(to_email, subject, html_content, text_content)
+        return self.queue_email(to_email, subject, html_content, text_content)
 
 # Create global email service instance
 email_service = EmailService()
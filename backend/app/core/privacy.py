@@ -1,13 +1,19 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, Iterable, List, Union, FrozenSet
 from functools import wraps
 from fastapi import HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 import re
 import logging
+import threading
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.settings import OrgSettings
+from app.services.cache_service import TTLCache, invalidate_after_commit
 
 logger = logging.getLogger(__name__)
 
@@ -24,20 +30,86 @@ class PrivacyViolationError(Exception):
     """Exception raised when privacy rules are violated"""
     pass
 
+# Process-wide org_id -> PrivacyRules. Each org has a version that every
+# settings write bumps, so a read that raced a write never caches stale rules.
+privacy_settings_cache = TTLCache(settings.PRIVACY_CACHE_MAX_SIZE, settings.PRIVACY_CACHE_TTL_SECONDS)
+_privacy_versions: Dict[str, int] = {}
+_privacy_versions_lock = threading.Lock()
+
+# Key of the per-session memo in Session.info; a session lives for one request
+_REQUEST_MEMO_KEY = "privacy_rules"
+
+def invalidate_privacy_settings(org_id: str) -> None:
+    """Drop cached privacy rules for an org after its settings change"""
+    with _privacy_versions_lock:
+        _privacy_versions[org_id] = _privacy_versions.get(org_id, 0) + 1
+    privacy_settings_cache.invalidate(org_id)
+
+@event.listens_for(OrgSettings, "after_insert")
+@event.listens_for(OrgSettings, "after_update")
+@event.listens_for(OrgSettings, "after_delete")
+def _invalidate_on_settings_write(mapper, connection, org_settings: OrgSettings) -> None:
+    # Deferred to commit: bumping the version at flush would let a reader that
+    # still sees the old committed row cache it under the new version
+    invalidate_after_commit(object_session(org_settings), invalidate_privacy_settings, org_settings.org_id)
+
+def _rules_from_settings(org_settings: Optional[OrgSettings]) -> PrivacyRules:
+    if org_settings is None:
+        return RULES
+    return PrivacyRules(min_n=org_settings.min_n_threshold or RULES.min_n)
+
+def _cached_privacy_settings(org_id: str, memo: Dict[str, PrivacyRules]) -> Optional[PrivacyRules]:
+    rules = memo.get(org_id)
+    if rules is None:
+        rules = privacy_settings_cache.get(org_id)
+        if rules is not None:
+            memo[org_id] = rules
+    return rules
+
+def _store_privacy_settings(org_id: str, version: int, rules: PrivacyRules, memo: Dict[str, PrivacyRules]) -> None:
+    memo[org_id] = rules
+    if _privacy_versions.get(org_id, 0) == version:
+        privacy_settings_cache.set(org_id, rules)
+
 def get_org_privacy_settings(org_id: str, db: Session) -> PrivacyRules:
-    """Get privacy settings for an organization"""
+    """Get privacy settings for an organization
+
+    Served from the request memo, then the process-wide cache, and only
+    read from OrgSettings on a miss.
+    """
+    memo = db.info.setdefault(_REQUEST_MEMO_KEY, {})
+    rules = _cached_privacy_settings(org_id, memo)
+    if rules is not None:
+        return rules
+    
+    version = _privacy_versions.get(org_id, 0)
     try:
         org_settings = db.query(OrgSettings).filter(OrgSettings.org_id == org_id).first()
-        if org_settings:
-            return PrivacyRules(
-                min_n=org_settings.min_n or 4,
-                min_segment_n=org_settings.min_segment_n or 4,
-                pii_masking_enabled=org_settings.pii_masking_enabled if hasattr(org_settings, 'pii_masking_enabled') else True
-            )
+    except Exception as e:
+        logger.error(f"Error getting org privacy settings: {str(e)}")
         return RULES
+    
+    rules = _rules_from_settings(org_settings)
+    _store_privacy_settings(org_id, version, rules, memo)
+    return rules
+
+async def get_org_privacy_settings_async(org_id: str, db: AsyncSession) -> PrivacyRules:
+    """Get privacy settings for an organization on an async session"""
+    memo = db.info.setdefault(_REQUEST_MEMO_KEY, {})
+    rules = _cached_privacy_settings(org_id, memo)
+    if rules is not None:
+        return rules
+    
+    version = _privacy_versions.get(org_id, 0)
+    try:
+        org_settings = await db.scalar(select(OrgSettings).where(OrgSettings.org_id == org_id))
     except Exception as e:
         logger.error(f"Error getting org privacy settings: {str(e)}")
         return RULES
+    
+    rules = _rules_from_settings(org_settings)
+    _store_privacy_settings(org_id, version, rules, memo)
+    return rules
 
 def enforce_min_n(response_count: int, min_n: int = None, org_id: str = None, db: Session = None) -> bool:
     """
@@ -144,6 +216,130 @@ def require_min_n(min_n_field: str = "min_n"):
         return wrapper
     return decorator
 
+@dataclass(frozen=True)
+class TeamACL:
+    """Teams a user can read analytics for, precomputed once per user
+    
+    Admins see every team, managers see the teams they belong to and
+    everyone else sees none. Team ids are kept as strings to match the
+    summary tables' team_id columns.
+    """
+    user_id: str
+    role: str
+    team_ids: FrozenSet[str] = frozenset()
+    
+    @property
+    def is_admin(self) -> bool:
+        return self.role == 'admin'
+    
+    @property
+    def team_id_list(self) -> List[str]:
+        """Sorted team ids, ready to bind as an IN list"""
+        return sorted(self.team_ids)
+    
+    def can_access(self, team_id: Any) -> bool:
+        """O(1) check for a single team"""
+        if self.is_admin:
+            return True
+        return self.role == 'manager' and str(team_id) in self.team_ids
+    
+    def scope(self, query, team_column):
+        """Restrict an org-wide query to the manager's teams"""
+        if self.role != 'manager':
+            return query
+        return query.where(team_column.in_(self.team_id_list))
+
+# Process-wide (user_id, role) -> TeamACL. Keying on role means a promotion
+# or demotion never serves the old scope; membership writes bump a version
+# per user the same way privacy settings do.
+team_acl_cache = TTLCache(settings.TEAM_ACL_CACHE_MAX_SIZE, settings.TEAM_ACL_CACHE_TTL_SECONDS)
+# A global generation covers users whose version was never bumped when
+# every ACL is dropped at once
+_team_acl_versions: Dict[str, int] = {}
+_team_acl_generation = 0
+_team_acl_versions_lock = threading.Lock()
+
+def _team_acl_version(user_id: str):
+    return (_team_acl_generation, _team_acl_versions.get(user_id, 0))
+
+def invalidate_team_acl(user_id: Any = None) -> None:
+    """Drop cached team ACLs for one user, or for everyone when user_id is None"""
+    global _team_acl_generation
+    if user_id is None:
+        with _team_acl_versions_lock:
+            _team_acl_generation += 1
+        team_acl_cache.clear()
+        return
+    
+    user_id = str(user_id)
+    with _team_acl_versions_lock:
+        _team_acl_versions[user_id] = _team_acl_versions.get(user_id, 0) + 1
+    for role in ('admin', 'manager', 'core'):
+        team_acl_cache.invalidate((user_id, role))
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_membership_write(session: Session, flush_context) -> None:
+    # Matched by class name so this module does not import the team models;
+    # async sessions flush through the same sync Session and land here too
+    # Invalidated once the session commits, so a reader cannot re-cache the
+    # membership that is about to be revoked
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        name = type(obj).__name__
+        if name == 'UserTeam':
+            invalidate_after_commit(session, invalidate_team_acl, obj.user_id)
+        elif name == 'Team' and obj in session.deleted:
+            invalidate_after_commit(session, invalidate_team_acl, None)
+
+def _team_ids_query(user_id: str):
+    from app.models.base import Team
+    from app.models.advanced import UserTeam
+    
+    return select(Team.id).join(UserTeam).where(UserTeam.user_id == user_id)
+
+def _cached_team_acl(user_id: str, role: str) -> Optional[TeamACL]:
+    if role != 'manager':
+        # Admins and other roles need no membership lookup
+        return TeamACL(user_id=user_id, role=role)
+    return team_acl_cache.get((user_id, role))
+
+def _store_team_acl(user_id: str, role: str, version, team_ids) -> TeamACL:
+    acl = TeamACL(user_id=user_id, role=role, team_ids=frozenset(str(team_id) for team_id in team_ids))
+    if _team_acl_version(user_id) == version:
+        team_acl_cache.set((user_id, role), acl)
+    return acl
+
+def get_team_acl(user_id: Any, role: str, db: Session) -> TeamACL:
+    """Get the team ACL for a user, reading UserTeam only on a cache miss"""
+    user_id = str(user_id)
+    acl = _cached_team_acl(user_id, role)
+    if acl is not None:
+        return acl
+    
+    version = _team_acl_version(user_id)
+    try:
+        team_ids = db.scalars(_team_ids_query(user_id)).all()
+    except Exception as e:
+        logger.error(f"Error loading team ACL: {str(e)}")
+        return TeamACL(user_id=user_id, role=role)
+    
+    return _store_team_acl(user_id, role, version, team_ids)
+
+async def get_team_acl_async(user_id: Any, role: str, db: AsyncSession) -> TeamACL:
+    """Get the team ACL for a user on an async session"""
+    user_id = str(user_id)
+    acl = _cached_team_acl(user_id, role)
+    if acl is not None:
+        return acl
+    
+    version = _team_acl_version(user_id)
+    try:
+        team_ids = (await db.scalars(_team_ids_query(user_id))).all()
+    except Exception as e:
+        logger.error(f"Error loading team ACL: {str(e)}")
+        return TeamACL(user_id=user_id, role=role)
+    
+    return _store_team_acl(user_id, role, version, team_ids)
+
 def validate_team_access(user_id: str, team_id: str, db: Session) -> bool:
     """
     Validate that user has access to team data
@@ -157,27 +353,62 @@ def validate_team_access(user_id: str, team_id: str, db: Session) -> bool:
         bool: True if user has access
     """
     try:
-        from app.models.base import User, Team, UserTeam
-        
-        # Check if user is admin (has access to all teams)
-        user = db.query(User).filter(User.id == user_id).first()
-        if user and user.role == 'admin':
-            return True
+        from app.models.base import User
         
-        # Check if user is manager of this team
-        if user and user.role == 'manager':
-            user_team = db.query(UserTeam).filter(
-                UserTeam.user_id == user_id,
-                UserTeam.team_id == team_id
-            ).first()
-            return user_team is not None
-        
-        return False
+        user = db.get(User, user_id)
+        if user is None:
+            return False
+        return get_team_acl(user_id, user.role, db).can_access(team_id)
         
     except Exception as e:
         logger.error(f"Error validating team access: {str(e)}")
         return False
 
+# PII patterns, compiled once and applied in this order. Each pass is gated
+# on a substring every match must contain, so plain comments skip the regex
+# engine entirely.
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RES = (
+    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+    re.compile(r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b'),
+    re.compile(r'\b\+\d{1,3}\s*\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+)
+_DIGIT_RUN_RE = re.compile(r'\d{3}')  # Every phone pattern contains one
+
+# Capitalized words that are not treated as names
+_NAME_STOPWORDS = frozenset([
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'from', 'this', 'that', 'these', 'those'
+])
+
+# Name candidates in single-space-joined text: any word but the first with
+# 3+ chars, not ending in '.' or ',', whose first char could be uppercase.
+# str.isupper has no re equivalent outside ASCII, so the callback confirms it.
+_NAME_CANDIDATE_RE = re.compile(r' ([A-Z\x80-\U0010FFFF][^ ]+[^ .,])(?= |$)')
+
+def _mask_name_match(match) -> str:
+    word = match.group(1)
+    if word[0].isupper() and word.lower() not in _NAME_STOPWORDS:
+        return ' [NAME]'
+    return match.group(0)
+
+def _may_contain_phone(text: str) -> bool:
+    if text.isascii():
+        return any(digit in text for digit in '0123456789')
+    return _DIGIT_RUN_RE.search(text) is not None
+
+def _mask_pii_text(text: str) -> str:
+    if '@' in text:
+        text = _EMAIL_RE.sub('[EMAIL]', text)
+    
+    if _may_contain_phone(text):
+        for phone_re in _PHONE_RES:
+            text = phone_re.sub('[PHONE]', text)
+    
+    # Names (capitalized words that might be names); split/join also
+    # collapses whitespace runs to single spaces
+    return _NAME_CANDIDATE_RE.sub(_mask_name_match, ' '.join(text.split()))
+
 def mask_pii(text: str, enabled: bool = True) -> str:
     """
     Mask personally identifiable information in text
@@ -193,31 +424,35 @@ def mask_pii(text: str, enabled: bool = True) -> str:
         return text
     
     try:
-        # Email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
-        
-        # Phone numbers (various formats)
-        text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        text = re.sub(r'\b\(\d{3}\)\s*\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        text = re.sub(r'\b\+\d{1,3}\s*\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        
-        # Names (capitalized words that might be names)
-        words = text.split()
-        for i, word in enumerate(words):
-            if (i > 0 and  # Not first word
-                word[0].isupper() and  # Starts with capital
-                len(word) > 2 and  # Reasonable length
-                not word.endswith('.') and  # Not end of sentence
-                not word.endswith(',') and  # Not punctuation
-                word.lower() not in ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'this', 'that', 'these', 'those']):
-                words[i] = '[NAME]'
-        
-        return ' '.join(words)
+        return _mask_pii_text(text)
         
     except Exception as e:
         logger.error(f"Error masking PII: {str(e)}")
         return text
 
+def mask_many(texts: Iterable[str], enabled: bool = True, processes: Optional[int] = None,
+              chunksize: int = 1000) -> List[str]:
+    """
+    Mask PII in a batch of texts, in order
+    
+    Args:
+        texts: Input texts
+        enabled: Whether PII masking is enabled
+        processes: Worker processes for large backfills; None masks inline
+        chunksize: Texts sent to a worker at a time
+        
+    Returns:
+        List[str]: Masked texts
+    """
+    if not enabled:
+        return list(texts)
+    
+    if not processes or processes <= 1:
+        return [mask_pii(text) for text in texts]
+    
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(mask_pii, texts, chunksize=chunksize))
+
 def safe_response_count(count: int, min_n: int = None, org_id: str = None, db: Session = None) -> Dict[str, Any]:
     """
     Return safe response count information
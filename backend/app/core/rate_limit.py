@@ -0,0 +1,182 @@
+"""
+Sliding-window rate limiting for survey-link abuse detection
+
+Throttle state lives outside the primary database: in process memory by
+default, or in Redis when several workers must share it.
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class MemoryRateLimitBackend:
+    """Per-process sliding-window log
+
+    Each key keeps at most `limit` timestamps, so memory per key is bounded
+    and a check is a few deque operations. Idle keys are evicted LRU once
+    max_keys is reached. Pass a fake clock to drive it in tests.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._events: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _window(self, key: Hashable, window: float, limit: int, now: float) -> deque:
+        events = self._events.get(key)
+        if events is None or events.maxlen != limit:
+            events = deque(events or (), maxlen=limit)
+            self._events[key] = events
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+        self._events.move_to_end(key)
+
+        cutoff = now - window
+        while events and events[0] <= cutoff:
+            events.popleft()
+        return events
+
+    def hit(self, key: Hashable, window: float, limit: int) -> int:
+        """Record an event and return the events in the window, capped at limit"""
+        now = self.clock()
+        with self._lock:
+            events = self._window(key, window, limit, now)
+            events.append(now)
+            return len(events)
+
+    def count(self, key: Hashable, window: float, limit: int) -> int:
+        """Events in the window, capped at limit"""
+        now = self.clock()
+        with self._lock:
+            return len(self._window(key, window, limit, now))
+
+    def reset(self) -> None:
+        """Forget every key"""
+        with self._lock:
+            self._events.clear()
+
+class RedisRateLimitBackend:
+    """Sliding-window log in Redis sorted sets, shared by every worker"""
+
+    def __init__(self, client, prefix: str = f"{settings.CACHE_PREFIX}:ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: Hashable) -> str:
+        if isinstance(key, tuple):
+            key = ":".join(str(part) for part in key)
+        return f"{self.prefix}:{key}"
+
+    def hit(self, key: Hashable, window: float, limit: int) -> int:
+        """Record an event and return the events in the window, capped at limit"""
+        redis_key = self._key(key)
+        now = time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(redis_key, "-inf", now - window)
+        pipe.zadd(redis_key, {f"{now}:{uuid.uuid4().hex[:8]}": now})
+        pipe.zremrangebyrank(redis_key, 0, -limit - 1)
+        pipe.zcard(redis_key)
+        pipe.expire(redis_key, math.ceil(window))
+        return pipe.execute()[3]
+
+    def count(self, key: Hashable, window: float, limit: int) -> int:
+        """Events in the window, capped at limit"""
+        redis_key = self._key(key)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zremrangebyscore(redis_key, "-inf", time.time() - window)
+        pipe.zcard(redis_key)
+        return min(pipe.execute()[1], limit)
+
+    def reset(self) -> None:
+        """Forget every key under this backend's prefix"""
+        for redis_key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(redis_key)
+
+class AbuseThrottler:
+    """Device throttling for survey links
+
+    A device is blocked for a survey after too many failed token attempts
+    in the device window, or too many attempts of any kind in the
+    frequency window. Backend errors fail open, as the old checks did.
+    """
+
+    def __init__(
+        self,
+        backend,
+        device_max_failed: int = 5,
+        device_window_seconds: float = 3600,
+        frequency_max_requests: int = 10,
+        frequency_window_seconds: float = 300
+    ):
+        self.backend = backend
+        self.device_max_failed = device_max_failed
+        self.device_window_seconds = device_window_seconds
+        self.frequency_max_requests = frequency_max_requests
+        self.frequency_window_seconds = frequency_window_seconds
+
+    def is_device_blocked(self, device_fingerprint: str, survey_id: str) -> bool:
+        """True if the device has too many recent failed attempts"""
+        try:
+            failed = self.backend.count(
+                ("failed", survey_id, device_fingerprint),
+                self.device_window_seconds,
+                self.device_max_failed
+            )
+        except Exception as e:
+            logger.error(f"Error checking device throttling: {str(e)}")
+            return False
+        return failed >= self.device_max_failed
+
+    def register_attempt(self, device_fingerprint: str, survey_id: str) -> bool:
+        """Count an attempt; True if the device is now over the frequency limit"""
+        try:
+            attempts = self.backend.hit(
+                ("attempt", survey_id, device_fingerprint),
+                self.frequency_window_seconds,
+                self.frequency_max_requests + 1
+            )
+        except Exception as e:
+            logger.error(f"Error checking frequency throttling: {str(e)}")
+            return False
+        return attempts > self.frequency_max_requests
+
+    def record_failure(self, device_fingerprint: str, survey_id: str) -> None:
+        """Count a failed token attempt against the device"""
+        try:
+            self.backend.hit(
+                ("failed", survey_id, device_fingerprint),
+                self.device_window_seconds,
+                self.device_max_failed
+            )
+        except Exception as e:
+            logger.error(f"Error recording failed attempt: {str(e)}")
+
+_throttler: Optional[AbuseThrottler] = None
+_throttler_lock = threading.Lock()
+
+def get_abuse_throttler() -> AbuseThrottler:
+    """Process-wide throttler on the backend chosen by RATE_LIMIT_BACKEND"""
+    global _throttler
+    if _throttler is None:
+        with _throttler_lock:
+            if _throttler is None:
+                _throttler = AbuseThrottler(_create_backend())
+    return _throttler
+
+def _create_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        from app.core.database import get_redis_client
+
+        client = get_redis_client()
+        if client is not None:
+            return RedisRateLimitBackend(client)
+        logger.warning("Redis unavailable, rate limiting falls back to per-process memory")
+    return MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
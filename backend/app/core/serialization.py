@@ -0,0 +1,41 @@
+"""
+Fast JSON serialization for API responses
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths render datetimes as ISO 8601 and UUID/Decimal as strings.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+
+def json_default(obj: Any) -> Any:
+    """Serialize the types models hand back that JSON lacks"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps_json; the app's default response class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -1,19 +1,26 @@
 """
 Enhanced Token Validation with Anti-abuse and Device Tracking
 """
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, delete, desc, func, select, update
 from datetime import datetime, timedelta
 import hashlib
 import logging
+import time
 from fastapi import HTTPException, Request, Depends
 
 from app.models.base import Survey, SurveyToken
 from app.core.database import get_db
+from app.core.rate_limit import get_abuse_throttler
 
 logger = logging.getLogger(__name__)
 
+# Bulk lifecycle operations work on the table directly: no ORM objects, and
+# rows touched per statement stay bounded by TOKEN_BATCH_SIZE
+survey_tokens = SurveyToken.__table__
+TOKEN_BATCH_SIZE = 5000
+
 class TokenAbuseException(Exception):
     """Exception for token abuse detection"""
     pass
@@ -45,66 +52,22 @@ def get_device_fingerprint(request: Request) -> str:
         logger.error(f"Error generating device fingerprint: {str(e)}")
         return "unknown"
 
-def check_device_throttling(
-    device_fingerprint: str,
-    survey_id: str,
-    db: Session,
-    max_attempts: int = 5,
-    window_minutes: int = 60
-) -> bool:
+def check_device_throttling(device_fingerprint: str, survey_id: str, db: Session = None) -> bool:
     """Check if device is being throttled due to suspicious activity"""
-    try:
-        # Check recent failed attempts from this device
-        cutoff_time = datetime.utcnow() - timedelta(minutes=window_minutes)
-        
-        failed_attempts = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.device_fingerprint == device_fingerprint,
-                SurveyToken.survey_id == survey_id,
-                SurveyToken.last_attempt_at >= cutoff_time,
-                SurveyToken.attempt_failed == True
-            )
-        ).count()
-        
-        if failed_attempts >= max_attempts:
-            logger.warning(f"Device {device_fingerprint} throttled for survey {survey_id}: {failed_attempts} failed attempts")
-            return False
-        
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error checking device throttling: {str(e)}")
-        return True  # Allow if error
+    # Attempt history lives in the rate-limit backend, not on token rows
+    if get_abuse_throttler().is_device_blocked(device_fingerprint, survey_id):
+        logger.warning(f"Device {device_fingerprint} throttled for survey {survey_id}: too many failed attempts")
+        return False
+    
+    return True
 
-def check_frequency_throttling(
-    device_fingerprint: str,
-    survey_id: str,
-    db: Session,
-    max_requests: int = 10,
-    window_minutes: int = 5
-) -> bool:
-    """Check if device is making too many requests too quickly"""
-    try:
-        # Check recent requests from this device
-        cutoff_time = datetime.utcnow() - timedelta(minutes=window_minutes)
-        
-        recent_requests = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.device_fingerprint == device_fingerprint,
-                SurveyToken.survey_id == survey_id,
-                SurveyToken.last_attempt_at >= cutoff_time
-            )
-        ).count()
-        
-        if recent_requests >= max_requests:
-            logger.warning(f"Device {device_fingerprint} frequency throttled for survey {survey_id}: {recent_requests} requests in {window_minutes} minutes")
-            return False
-        
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error checking frequency throttling: {str(e)}")
-        return True  # Allow if error
+def check_frequency_throttling(device_fingerprint: str, survey_id: str, db: Session = None) -> bool:
+    """Check if device is making too many requests too quickly (counts this request)"""
+    if get_abuse_throttler().register_attempt(device_fingerprint, survey_id):
+        logger.warning(f"Device {device_fingerprint} frequency throttled for survey {survey_id}")
+        return False
+    
+    return True
 
 def validate_survey_token(
     token: str, 
@@ -165,7 +128,7 @@ def validate_survey_token(
             raise HTTPException(status_code=410, detail="Survey is no longer active")
         
         # Check if token is expired
-        if survey.closes_at and datetime.utcnow() > survey.closes_at:
+        if survey.end_date and datetime.utcnow() > survey.end_date:
             # Log failed attempt
             _log_failed_attempt(token, survey_id, device_fingerprint, db, "token_expired")
             raise HTTPException(status_code=410, detail="Survey window has closed")
@@ -222,34 +185,66 @@ def mark_token_used(token: str, db: Session) -> None:
         db.rollback()
         raise
 
-def auto_expire_tokens(survey_id: str, db: Session) -> int:
-    """Auto-expire all unused tokens when survey closes"""
+def auto_expire_tokens(
+    survey_id: str,
+    db: Session,
+    batch_size: int = TOKEN_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Auto-expire all unused tokens when survey closes
+    
+    Tokens are expired with set-based UPDATEs of at most batch_size rows,
+    walked in id order and committed per batch, so row locks stay short
+    and nothing is loaded into the session.
+    
+    Args:
+        survey_id: Survey ID
+        db: Database session
+        batch_size: Tokens per UPDATE
+        progress: Called with the running total after each batch
+        
+    Returns:
+        int: Number of tokens expired
+    """
+    expired_count = 0
+    last_id = 0
     try:
-        # Get all unused tokens for this survey
-        unused_tokens = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.survey_id == survey_id,
-                SurveyToken.used == False
+        while True:
+            batch_ids = db.execute(
+                select(survey_tokens.c.id)
+                .where(
+                    survey_tokens.c.survey_id == survey_id,
+                    survey_tokens.c.used == False,
+                    survey_tokens.c.id > last_id
+                )
+                .order_by(survey_tokens.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not batch_ids:
+                break
+            
+            now = datetime.utcnow()
+            result = db.execute(
+                update(survey_tokens)
+                .where(survey_tokens.c.id.in_(batch_ids), survey_tokens.c.used == False)
+                .values(used=True, used_at=now, expired_at=now, expired_reason="survey_closed")
             )
-        ).all()
-        
-        expired_count = 0
-        for token in unused_tokens:
-            token.used = True
-            token.used_at = datetime.utcnow()
-            token.expired_at = datetime.utcnow()
-            token.expired_reason = "survey_closed"
-            expired_count += 1
-        
-        db.commit()
+            db.commit()
+            
+            expired_count += result.rowcount
+            last_id = batch_ids[-1]
+            if progress:
+                progress(expired_count)
+            logger.debug(f"Auto-expired {expired_count} tokens so far for survey {survey_id}")
         
         logger.info(f"Auto-expired {expired_count} tokens for survey {survey_id}")
         return expired_count
         
     except Exception as e:
-        logger.error(f"Error auto-expiring tokens: {str(e)}")
+        logger.error(f"Error auto-expiring tokens after {expired_count}: {str(e)}")
         db.rollback()
-        return 0
+        return expired_count
 
 def _log_failed_attempt(
     token: str,
@@ -282,6 +277,8 @@ def _log_failed_attempt(
         
     except Exception as e:
         logger.error(f"Error logging failed attempt: {str(e)}")
+    
+    get_abuse_throttler().record_failure(device_fingerprint, survey_id)
 
 def get_validated_team_id(
     token: str, 
@@ -292,49 +289,70 @@ def get_validated_team_id(
     """FastAPI dependency for token validation"""
     return validate_survey_token(token, survey_id, db, request)
 
-def cleanup_expired_tokens(db: Session, days_old: int = 30) -> int:
-    """Clean up old expired tokens to prevent database bloat"""
-    try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+def cleanup_expired_tokens(
+    db: Session,
+    days_old: int = 30,
+    batch_size: int = TOKEN_BATCH_SIZE,
+    pause_seconds: float = 0.05,
+    progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Clean up old expired tokens to prevent database bloat
+    
+    Deletes in batches of batch_size, committing and pausing between
+    batches so a large purge does not hold locks or starve other writers.
+    
+    Args:
+        db: Database session
+        days_old: Minimum age of expired tokens to delete
+        batch_size: Tokens per DELETE
+        pause_seconds: Sleep between batches
+        progress: Called with the running total after each batch
         
-        # Delete old expired tokens
-        deleted_count = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.expired_at.isnot(None),
-                SurveyToken.expired_at < cutoff_date
+    Returns:
+        int: Number of tokens deleted
+    """
+    cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+    deleted_count = 0
+    try:
+        while True:
+            batch = (
+                select(survey_tokens.c.id)
+                .where(
+                    survey_tokens.c.expired_at.isnot(None),
+                    survey_tokens.c.expired_at < cutoff_date
+                )
+                .limit(batch_size)
+                .scalar_subquery()
             )
-        ).delete()
-        
-        db.commit()
+            result = db.execute(delete(survey_tokens).where(survey_tokens.c.id.in_(batch)))
+            db.commit()
+            
+            deleted_count += result.rowcount
+            if progress:
+                progress(deleted_count)
+            if result.rowcount < batch_size:
+                break
+            time.sleep(pause_seconds)
         
         logger.info(f"Cleaned up {deleted_count} expired tokens older than {days_old} days")
         return deleted_count
         
     except Exception as e:
-        logger.error(f"Error cleaning up expired tokens: {str(e)}")
+        logger.error(f"Error cleaning up expired tokens after {deleted_count}: {str(e)}")
         db.rollback()
-        return 0
+        return deleted_count
 
 def get_token_usage_stats(survey_id: str, db: Session) -> Dict[str, Any]:
-    """Get token usage statistics for a survey"""
+    """Get token usage statistics for a survey in one aggregate query"""
     try:
-        total_tokens = db.query(SurveyToken).filter(
-            SurveyToken.survey_id == survey_id
-        ).count()
-        
-        used_tokens = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.survey_id == survey_id,
-                SurveyToken.used == True
-            )
-        ).count()
-        
-        failed_attempts = db.query(SurveyToken).filter(
-            and_(
-                SurveyToken.survey_id == survey_id,
-                SurveyToken.attempt_failed == True
-            )
-        ).count()
+        total_tokens, used_tokens, failed_attempts = db.execute(
+            select(
+                func.count(),
+                func.count().filter(survey_tokens.c.used == True),
+                func.count().filter(survey_tokens.c.attempt_failed == True)
+            ).where(survey_tokens.c.survey_id == survey_id)
+        ).one()
         
         return {
             "total_tokens": total_tokens,
@@ -6,6 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 import os
 
+from app.core.serialization import FastJSONResponse
+
 logger = logging.getLogger(__name__)
 
 def create_app() -> FastAPI:
@@ -14,7 +16,8 @@ def create_app() -> FastAPI:
         description="Backend API for MVP survey management platform",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=FastJSONResponse
     )
 
     # CORS middleware
@@ -69,6 +72,10 @@ def create_app() -> FastAPI:
     from app.models.base import Item
     Item.__table__.create(bind=engine, checkfirst=True)
 
+    # Existing surveys tables predate the submission counter
+    from app.core.database import ensure_submission_counter
+    ensure_submission_counter()
+
     @app.post("/items", response_model=schemas.ItemOut)
     def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
         db_item = models.Item(name=item.name)
@@ -103,6 +110,18 @@ def create_app() -> FastAPI:
         db.commit()
         return {"ok": True}
 
+    # Write buffered audit events before the process exits
+    @app.on_event("shutdown")
+    def flush_audit_log():
+        from app.core.audit_log import shutdown_audit_sink
+        shutdown_audit_sink()
+
+    # Deliver queued email before the process exits
+    @app.on_event("shutdown")
+    def flush_email_outbox():
+        from app.core.email import email_service
+        email_service.shutdown()
+
     # Include API routes (commented out due to missing advanced models)
     # from app.api.v1.api import api_router
     # app.include_router(api_router, prefix="/api/v1")
@@ -10,6 +10,7 @@ from .base import (
     Response,
     Answer,
     FileAttachment,
+    AuditLog,
     Item
 )
 
@@ -29,6 +30,7 @@ __all__ = [
     "Response",
     "Answer",
     "FileAttachment",
+    "AuditLog",
     "Item",
     
     # Settings models
@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, JSON, func, select
+from sqlalchemy.orm import column_property, relationship
 from app.core.database import Base
 
 class User(Base):
@@ -93,12 +93,16 @@ class Survey(Base):
     category = Column(String(50), default='general')
     company_size = Column(Integer, default=10)  # MVP: company size for submission limit
     max_submissions = Column(Integer, default=10)  # MVP: max submissions allowed
+    # Counts Response rows and enforces max_submissions. The user-survey submit
+    # endpoint is the only writer of Response rows; token-validated submissions
+    # store NumericResponse rows and are capped by their single-use tokens instead
+    current_submissions = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     creator = relationship("User", back_populates="surveys")
-    questions = relationship("Question", back_populates="survey", cascade="all, delete-orphan")
+    questions = relationship("Question", back_populates="survey", cascade="all, delete-orphan", order_by="Question.order")
     responses = relationship("Response", back_populates="survey", cascade="all, delete-orphan")
     attachments = relationship("FileAttachment", back_populates="survey", cascade="all, delete-orphan")
 
@@ -118,7 +122,7 @@ class Survey(Base):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'questions': [q.to_dict() for q in self.questions],
-            'response_count': len(self.responses),
+            'response_count': self.response_count,
             'attachments': [a.to_dict() for a in self.attachments]
         }
 
@@ -180,7 +184,7 @@ class SurveyTemplate(Base):
 class Response(Base):
     __tablename__ = "responses"
     id = Column(Integer, primary_key=True)
-    survey_id = Column(Integer, ForeignKey('surveys.id'), nullable=False)
+    survey_id = Column(Integer, ForeignKey('surveys.id'), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)  # Nullable for anonymous responses
     submitted_at = Column(DateTime, default=datetime.utcnow)
     completed = Column(Boolean, default=True)
@@ -200,6 +204,16 @@ class Response(Base):
             'answers': [a.to_dict() for a in self.answers]
         }
 
+# Counted in SQL instead of loading every Response. Deferred, so only loads
+# that undefer it (see survey_relationships) pay for the subquery.
+Survey.response_count = column_property(
+    select(func.count(Response.id))
+    .where(Response.survey_id == Survey.id)
+    .correlate_except(Response)
+    .scalar_subquery(),
+    deferred=True
+)
+
 class Answer(Base):
     __tablename__ = "answers"
     id = Column(Integer, primary_key=True)
@@ -257,6 +271,7 @@ class SurveyToken(Base):
     id = Column(Integer, primary_key=True)
     token = Column(String(255), unique=True, nullable=False, index=True)
     survey_id = Column(String(50), nullable=False, index=True)
+    team_id = Column(String(50))  # Team the invitation was issued for; never the employee
     used = Column(Boolean, default=False)
     used_at = Column(DateTime)
     expires_at = Column(DateTime)
@@ -266,6 +281,10 @@ class SurveyToken(Base):
     device_fingerprint = Column(String(255), index=True)
     last_attempt_at = Column(DateTime)
     attempt_failed = Column(Boolean, default=False)
+    failure_count = Column(Integer, default=0)
+    last_failure_reason = Column(String(50))
+    expired_at = Column(DateTime, index=True)
+    expired_reason = Column(String(50))
     ip_address = Column(String(45))  # IPv6 compatible
     user_agent = Column(Text)
     
@@ -285,6 +304,31 @@ class SurveyToken(Base):
             'user_agent': self.user_agent
         }
 
+class AuditLog(Base):
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_resource", "resource_type", "resource_id", "ts"),
+        {'extend_existing': True}
+    )
+    id = Column(Integer, primary_key=True)
+    ts = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    action = Column(String(100), nullable=False, index=True)
+    resource_type = Column(String(50), nullable=False)
+    resource_id = Column(String(100))
+    user_id = Column(String(50), index=True)  # Null for anonymous survey submissions
+    details = Column(JSON)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'ts': self.ts.isoformat() if self.ts else None,
+            'action': self.action,
+            'resource_type': self.resource_type,
+            'resource_id': self.resource_id,
+            'user_id': self.user_id,
+            'details': self.details
+        }
+
 class Item(Base):
     __tablename__ = "items"
     id = Column(Integer, primary_key=True, index=True)
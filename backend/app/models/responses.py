@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Numeric
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Numeric, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -36,3 +36,9 @@ class Comment(Base):
     survey = relationship("Survey")
     team = relationship("Team")
     driver = relationship("Driver")
+    
+    # Keyset pagination walks (ts, id) newest first within a survey/team
+    __table_args__ = (
+        Index("ix_comments_survey_ts_id", "survey_id", "ts", "id"),
+        Index("ix_comments_survey_team_ts_id", "survey_id", "team_id", "ts", "id"),
+    )
@@ -9,7 +9,7 @@ class OrgSettings(Base):
     __tablename__ = 'org_settings'
 
     id = Column(Integer, primary_key=True)
-    org_id = Column(String(255), nullable=False)
+    org_id = Column(String(255), nullable=False, index=True)
     min_n_threshold = Column(Integer, default=5)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
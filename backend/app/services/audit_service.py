@@ -1,28 +1,87 @@
 """
-Simplified Audit Service for MVP
+Audit Service
+Records audit events through the buffered audit log sink
 """
 import logging
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.audit_log import audit_logs, get_audit_sink
+
 logger = logging.getLogger(__name__)
 
 class AuditService:
-    """Simplified audit service for MVP"""
+    """Audit logging and lookup
+    
+    Logging only queues the event (see app.core.audit_log), so it is safe to
+    call from request handlers; events reach storage within
+    AUDIT_FLUSH_INTERVAL_SECONDS. A session is only needed for query_logs.
+    """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None):
         self.db = db
     
     def log_action(self, user_id: str, action: str, resource_type: str, resource_id: str = None, details: Dict[str, Any] = None):
-        """Log a general action (simplified for MVP)"""
+        """Log a general action"""
         try:
-            logger.info(f"Audit: {action} on {resource_type} {resource_id} by user {user_id}")
+            get_audit_sink().enqueue({
+                "ts": datetime.utcnow(),
+                "action": action,
+                "resource_type": resource_type,
+                "resource_id": str(resource_id) if resource_id is not None else None,
+                "user_id": str(user_id) if user_id is not None else None,
+                "details": details
+            })
+            logger.debug(f"Audit: {action} on {resource_type} {resource_id} by user {user_id}")
         except Exception as e:
             logger.error(f"Failed to log audit action: {str(e)}")
     
     def log_survey_submission(self, survey_id: str, user_id: str = None, details: Dict[str, Any] = None):
-        """Log survey submission (simplified for MVP)"""
-        try:
-            logger.info(f"Survey submitted: {survey_id} by {user_id or 'anonymous'}")
-        except Exception as e:
-            logger.error(f"Failed to log survey submission: {str(e)}")
+        """Log survey submission"""
+        self.log_action(user_id, "survey_submitted", "survey", survey_id, details)
+    
+    def query_logs(
+        self,
+        action: Optional[str] = None,
+        user_id: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        before_id: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest-first audit events matching every given filter
+        
+        Filters map onto the indexed columns (action, user_id, ts and
+        resource_type + resource_id). Pass the last id of a page as
+        before_id to fetch the next one.
+        """
+        if self.db is None:
+            raise ValueError("query_logs needs a database session")
+        
+        query = select(audit_logs)
+        if action is not None:
+            query = query.where(audit_logs.c.action == action)
+        if user_id is not None:
+            query = query.where(audit_logs.c.user_id == str(user_id))
+        if resource_type is not None:
+            query = query.where(audit_logs.c.resource_type == resource_type)
+        if resource_id is not None:
+            query = query.where(audit_logs.c.resource_id == str(resource_id))
+        if since is not None:
+            query = query.where(audit_logs.c.ts >= since)
+        if until is not None:
+            query = query.where(audit_logs.c.ts < until)
+        if before_id is not None:
+            query = query.where(audit_logs.c.id < before_id)
+        
+        limit = max(1, min(limit, 1000))
+        rows = self.db.execute(query.order_by(audit_logs.c.id.desc()).limit(limit)).mappings()
+        return [
+            {**row, "ts": row["ts"].isoformat() if row["ts"] else None}
+            for row in rows
+        ]
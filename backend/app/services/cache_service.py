@@ -2,10 +2,110 @@
 Simplified Cache Service for MVP
 """
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache value for ttl seconds (the cache default when None)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Drop one entry"""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
+
+# Session.info key of the invalidations waiting for the session's commit
+_PENDING_INVALIDATIONS_KEY = "pending_cache_invalidations"
+
+def invalidate_after_commit(session: Optional[Session], invalidate: Callable[[Hashable], None], key: Hashable) -> None:
+    """Call invalidate(key) once session commits; forgotten if it rolls back
+
+    Invalidating at flush is too early: until the commit lands, a concurrent
+    reader still sees the old row and could cache it again. Without a
+    session the invalidation runs immediately.
+    """
+    if session is None:
+        invalidate(key)
+        return
+    pending = session.info.setdefault(_PENDING_INVALIDATIONS_KEY, {})
+    pending.setdefault(invalidate, set()).add(key)
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_invalidations(session: Session) -> None:
+    # Fires for the outermost commit only; async sessions commit through the
+    # same sync Session and land here too
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    for invalidate, keys in (pending or {}).items():
+        for key in keys:
+            try:
+                invalidate(key)
+            except Exception as e:
+                logger.error(f"Cache invalidation failed for {key}: {str(e)}")
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_invalidations(session: Session, transaction) -> None:
+    # Anything still pending when the outermost transaction ends was rolled back
+    if transaction.parent is None:
+        session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+
 class CacheService:
     """Simplified cache service for MVP (no Redis dependency)"""
     
@@ -0,0 +1,135 @@
+"""
+Invitation Service
+Mints survey invitation tokens in bulk for a survey launch
+"""
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.base import SurveyToken
+from app.services.token_generator import TokenGenerator
+
+logger = logging.getLogger(__name__)
+
+survey_tokens = SurveyToken.__table__
+
+# Columns written by COPY, in record order
+_COPY_COLUMNS = ("token", "survey_id", "team_id", "used", "expires_at", "created_at", "attempt_failed", "failure_count")
+
+class InvitationService:
+    """Bulk invitation tokens for a survey launch
+
+    Tokens are generated a chunk at a time and written with COPY on
+    PostgreSQL (asyncpg) or a single executemany INSERT elsewhere. The whole
+    launch is one transaction, so a failed launch leaves no stray tokens.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        generator: Optional[TokenGenerator] = None,
+        chunk_size: int = settings.INVITE_TOKEN_CHUNK_SIZE
+    ):
+        self.db = db
+        self.generator = generator or TokenGenerator()
+        self.chunk_size = chunk_size
+
+    async def mint_tokens(
+        self,
+        survey_id: str,
+        team_sizes: Mapping[str, int],
+        expires_at: Optional[datetime] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Mint one single-use token per invitee and store them
+
+        Args:
+            survey_id: Survey ID
+            team_sizes: Number of invitees per team ID
+            expires_at: Optional expiry stamped on every token
+            progress: Called with (minted, total) after each chunk
+
+        Returns:
+            Dict[str, List[str]]: Tokens per team ID, for delivery
+        """
+        total = sum(team_sizes.values())
+        tokens_by_team: Dict[str, List[str]] = {team_id: [] for team_id in team_sizes}
+        minted = 0
+
+        try:
+            for chunk in self._chunks(team_sizes):
+                tokens = self.generator.generate_batch_tokens(len(chunk))
+                await self._write_chunk(survey_id, list(zip(chunk, tokens)), expires_at)
+
+                for team_id, token in zip(chunk, tokens):
+                    tokens_by_team[team_id].append(token)
+                minted += len(chunk)
+                if progress:
+                    progress(minted, total)
+
+            await self.db.commit()
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error minting invitation tokens for survey {survey_id} after {minted}: {str(e)}")
+            raise
+
+        logger.info(f"Minted {minted} invitation tokens for survey {survey_id} across {len(team_sizes)} teams")
+        return tokens_by_team
+
+    def _chunks(self, team_sizes: Mapping[str, int]):
+        """Team ID per invitee, in chunks of at most chunk_size"""
+        chunk: List[str] = []
+        for team_id, size in team_sizes.items():
+            remaining = size
+            while remaining:
+                take = min(remaining, self.chunk_size - len(chunk))
+                chunk.extend([team_id] * take)
+                remaining -= take
+                if len(chunk) == self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    async def _write_chunk(
+        self,
+        survey_id: str,
+        assignments: List[Tuple[str, str]],
+        expires_at: Optional[datetime]
+    ) -> None:
+        """Write one chunk of (team_id, token) pairs in a single round trip"""
+        now = datetime.utcnow()
+        connection = await self.db.connection()
+
+        if connection.dialect.driver == "asyncpg":
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                survey_tokens.name,
+                records=[
+                    (token, survey_id, team_id, False, expires_at, now, False, 0)
+                    for team_id, token in assignments
+                ],
+                columns=_COPY_COLUMNS,
+                schema_name=survey_tokens.schema
+            )
+            return
+
+        await connection.execute(insert(survey_tokens), [
+            {
+                "token": token,
+                "survey_id": survey_id,
+                "team_id": team_id,
+                "used": False,
+                "expires_at": expires_at,
+                "created_at": now,
+                "attempt_failed": False,
+                "failure_count": 0
+            }
+            for team_id, token in assignments
+        ])
@@ -0,0 +1,186 @@
+"""
+Survey Submission Service
+Records a token-validated anonymous submission in a single transaction
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.rate_limit import AbuseThrottler, get_abuse_throttler
+from app.models.base import Survey, SurveyToken
+from app.models.responses import NumericResponse, Comment
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SubmissionResult:
+    """Outcome of an accepted submission"""
+    team_id: str
+    creator_id: Optional[int]
+    comment_id: Optional[str]
+    scores_recorded: int
+
+class SubmissionService:
+    """Token-validated survey submissions
+
+    The happy path is an in-memory throttle check, one UPDATE ... RETURNING
+    that claims the token and checks the survey, bulk inserts, and one commit.
+    Rejections take a slower diagnostic path to pick the right error.
+    """
+
+    def __init__(self, db: AsyncSession, throttler: Optional[AbuseThrottler] = None):
+        self.db = db
+        self.throttler = throttler or get_abuse_throttler()
+
+    async def submit(
+        self,
+        survey_id: str,
+        token: str,
+        scores: Iterable[Tuple[str, int]],
+        comment: Optional[str] = None,
+        device_fingerprint: str = "unknown"
+    ) -> SubmissionResult:
+        """
+        Claim a survey token and store its responses atomically
+
+        Args:
+            survey_id: Survey ID
+            token: Single-use survey token
+            scores: (driver_id, score) pairs
+            comment: Optional free-text comment
+            device_fingerprint: Fingerprint of the submitting device
+
+        Returns:
+            SubmissionResult: Team and ids of what was stored
+
+        Raises:
+            HTTPException: If the token is invalid, used or throttled, or
+                the survey is not open
+        """
+        now = datetime.utcnow()
+
+        try:
+            self._check_throttling(survey_id, device_fingerprint)
+
+            # The token only flips if the survey is open; SQLite cannot
+            # RETURNING from an UPDATE ... FROM table, hence the subqueries
+            open_survey = select(Survey.creator_id).where(
+                Survey.id == survey_id,
+                Survey.status == "active",
+                or_(Survey.end_date.is_(None), Survey.end_date > now)
+            )
+            claimed = (await self.db.execute(
+                update(SurveyToken)
+                .where(
+                    SurveyToken.token == token,
+                    SurveyToken.survey_id == survey_id,
+                    SurveyToken.used == False,
+                    open_survey.exists()
+                )
+                .values(
+                    used=True,
+                    used_at=now,
+                    last_attempt_at=now,
+                    device_fingerprint=device_fingerprint,
+                    attempt_failed=False
+                )
+                .returning(SurveyToken.team_id, open_survey.scalar_subquery().label("creator_id"))
+                .execution_options(synchronize_session=False)
+            )).first()
+
+            if claimed is None:
+                await self._reject(survey_id, token, device_fingerprint, now)
+
+            team_id = str(claimed.team_id)
+            rows = [
+                {"survey_id": survey_id, "team_id": team_id, "driver_id": driver_id, "score": score, "ts": now}
+                for driver_id, score in scores
+            ]
+            if rows:
+                await self.db.execute(insert(NumericResponse), rows)
+
+            comment_id = None
+            if comment:
+                comment_id = uuid.uuid4()
+                await self.db.execute(insert(Comment).values(
+                    id=comment_id,
+                    survey_id=survey_id,
+                    team_id=team_id,
+                    driver_id=None,  # General comment
+                    text=comment,
+                    ts=now
+                ))
+
+            await self.db.commit()
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error recording survey submission: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error recording survey response")
+
+        logger.info(f"Survey response recorded for survey {survey_id}, team {team_id}")
+        return SubmissionResult(
+            team_id=team_id,
+            creator_id=claimed.creator_id,
+            comment_id=str(comment_id) if comment_id else None,
+            scores_recorded=len(rows)
+        )
+
+    def _check_throttling(self, survey_id: str, device_fingerprint: str) -> None:
+        """Device and frequency throttling, answered by the rate-limit backend"""
+        if self.throttler.is_device_blocked(device_fingerprint, survey_id):
+            logger.warning(f"Device {device_fingerprint} throttled for survey {survey_id}: too many failed attempts")
+            raise HTTPException(status_code=429, detail="Device is temporarily blocked due to suspicious activity")
+
+        if self.throttler.register_attempt(device_fingerprint, survey_id):
+            logger.warning(f"Device {device_fingerprint} frequency throttled for survey {survey_id}")
+            raise HTTPException(status_code=429, detail="Too many requests from this device")
+
+    async def _reject(self, survey_id: str, token: str, device_fingerprint: str, now: datetime) -> None:
+        """Work out why a claim matched nothing, record the failure and raise"""
+        self.throttler.record_failure(device_fingerprint, survey_id)
+
+        survey = (await self.db.execute(
+            select(Survey.status, Survey.end_date).where(Survey.id == survey_id)
+        )).first()
+        if survey is None or survey.status != "active":
+            raise HTTPException(status_code=404, detail="Survey not found or not active")
+
+        token_used = await self.db.scalar(
+            select(SurveyToken.used).where(
+                SurveyToken.token == token,
+                SurveyToken.survey_id == survey_id
+            )
+        )
+        if token_used is None:
+            status_code, detail, reason = 400, "Invalid survey link", "invalid_token"
+        elif token_used:
+            status_code, detail, reason = 409, "This survey link has already been used", "token_already_used"
+        else:
+            status_code, detail, reason = 410, "Survey window has closed", "token_expired"
+
+        if token_used is not None:
+            await self.db.execute(
+                update(SurveyToken)
+                .where(and_(SurveyToken.token == token, SurveyToken.survey_id == survey_id))
+                .values(
+                    attempt_failed=True,
+                    last_attempt_at=now,
+                    device_fingerprint=device_fingerprint,
+                    failure_count=func.coalesce(SurveyToken.failure_count, 0) + 1,
+                    last_failure_reason=reason
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+
+        logger.warning(f"Failed token attempt: {reason} for token {token[:8]}... from device {device_fingerprint[:8]}...")
+        raise HTTPException(status_code=status_code, detail=detail)
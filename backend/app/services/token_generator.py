@@ -20,6 +20,14 @@ class TokenGenerator:
         """
         self.token_length = token_length
         self.alphabet = string.ascii_letters + string.digits
+        
+        # Random bytes map onto the alphabet through one bytes.translate;
+        # bytes past the largest multiple of the alphabet size are dropped
+        # so every character stays equally likely
+        alphabet_size = len(self.alphabet)
+        self._accept_limit = 256 - 256 % alphabet_size
+        self._byte_table = bytes(ord(self.alphabet[i % alphabet_size]) for i in range(256))
+        self._rejected_bytes = bytes(range(self._accept_limit, 256))
     
     def generate_token(self) -> str:
         """
@@ -28,7 +36,17 @@ class TokenGenerator:
         Returns:
             A secure random token string
         """
-        return ''.join(secrets.choice(self.alphabet) for _ in range(self.token_length))
+        return self._random_chars(self.token_length)
+    
+    def _random_chars(self, count: int) -> str:
+        """Draw count characters uniformly from the alphabet"""
+        chars = b''
+        while len(chars) < count:
+            needed = count - len(chars)
+            # Over-draw by the rejection rate so one call almost always suffices
+            raw = secrets.token_bytes(needed * 256 // self._accept_limit + 16)
+            chars += raw.translate(self._byte_table, self._rejected_bytes)
+        return chars[:count].decode('ascii')
     
     def generate_uuid_token(self) -> str:
         """
@@ -77,13 +95,28 @@ class TokenGenerator:
         """
         Generate multiple tokens at once
         
+        All randomness for the batch is drawn in one call and sliced into
+        tokens, so cost is dominated by the OS random source rather than a
+        Python loop per character.
+        
         Args:
             count: Number of tokens to generate
             
         Returns:
-            List of generated tokens
+            List of distinct generated tokens
         """
-        tokens = []
-        for _ in range(count):
-            tokens.append(self.generate_token())
+        length = self.token_length
+        chars = self._random_chars(count * length)
+        tokens = [chars[i:i + length] for i in range(0, count * length, length)]
+        
+        # Collisions are astronomically unlikely at this length, but a batch
+        # is written under a unique constraint, so keep it distinct anyway
+        unique = set(tokens)
+        while len(unique) < count:
+            token = self.generate_token()
+            if token not in unique:
+                unique.add(token)
+                tokens.append(token)
+        if len(tokens) > count:
+            tokens = list(dict.fromkeys(tokens))
         return tokens
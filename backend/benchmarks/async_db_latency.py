@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark p50/p99 latency of fast requests while slow queries are in flight
+
+Serves two identical routes on an in-process ASGI app: one runs its queries
+on the synchronous SessionLocal inside ``async def`` (how the routers used to
+work), the other awaits them on get_async_db's AsyncSession. Each run mixes
+a few slow "analytics" queries into a stream of fast lookups.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/async_db_latency.py
+    DATABASE_URL=postgresql://localhost/novora_bench python benchmarks/async_db_latency.py --slow-rows 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal, engine, get_async_db
+
+# Slow "analytics" query: PostgreSQL waits server-side like a query stuck on
+# I/O or locks; SQLite has no sleep, so a recursive count burns CPU instead
+SLOW_SQL = {
+    "postgresql": text("SELECT pg_sleep(:rows / 1000.0)"),
+    "sqlite": text("""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+        SELECT COUNT(*) FROM n
+    """),
+}[engine.dialect.name]
+FAST_SQL = text("SELECT 1")
+
+
+def build_app(slow_rows: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/{kind}")
+    async def sync_route(kind: str):
+        db = SessionLocal()
+        try:
+            if kind == "slow":
+                return {"count": db.execute(SLOW_SQL, {"rows": slow_rows}).scalar()}
+            return {"ok": db.execute(FAST_SQL).scalar()}
+        finally:
+            db.close()
+
+    @app.get("/async/{kind}")
+    async def async_route(kind: str, db: AsyncSession = Depends(get_async_db)):
+        if kind == "slow":
+            return {"count": (await db.execute(SLOW_SQL, {"rows": slow_rows})).scalar()}
+        return {"ok": (await db.execute(FAST_SQL)).scalar()}
+
+    return app
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, requests: int, slow_every: int, rate: float):
+    """Issue requests on a fixed open-loop schedule and time fast ones from their scheduled start
+
+    Timing from the schedule rather than from when the task got to run is
+    what exposes a blocked event loop: queued requests wait, and that wait counts.
+    """
+    latencies = []
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+
+    async def one(i: int):
+        scheduled = t0 + i / rate
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        kind = "slow" if i % slow_every == 0 else "fast"
+        response = await client.get(f"/{mode}/{kind}")
+        response.raise_for_status()
+        if kind == "fast":
+            latencies.append((loop.time() - scheduled) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    latencies.sort()
+    return {
+        "fast_requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--slow-every", type=int, default=50, help="every Nth request is a slow query")
+    parser.add_argument("--slow-rows", type=int, default=100000,
+                        help="rows counted by the SQLite slow query; milliseconds slept on PostgreSQL")
+    parser.add_argument("--rate", type=float, default=500, help="requests per second")
+    args = parser.parse_args()
+
+    app = build_app(args.slow_rows)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for mode in ("sync", "async"):
+            await client.get(f"/{mode}/fast")  # warm up the pool
+            results = await run_mode(client, mode, args.requests, args.slow_every, args.rate)
+            print(f"{mode:6} session  {results}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
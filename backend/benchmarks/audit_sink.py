@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark audit logging latency on the request path
+
+Compares AuditService.log_action through the buffered sink with writing
+each event synchronously (one INSERT and commit per event), and reports
+per-call latency percentiles and end-to-end throughput.
+
+    DATABASE_URL=sqlite:////tmp/audit.db python benchmarks/audit_sink.py --events 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+
+from app.core import audit_log
+from app.core.audit_log import AuditSink, DatabaseAuditWriter, audit_logs
+from app.core.database import engine
+from app.services.audit_service import AuditService
+
+
+def event(i: int):
+    return {
+        "ts": datetime.utcnow(),
+        "action": "survey_submitted",
+        "resource_type": "survey",
+        "resource_id": str(i % 50),
+        "user_id": None,
+        "details": {"team_id": f"team-{i % 200}", "device_fingerprint": "f" * 64}
+    }
+
+
+def sync_log(i: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(audit_logs).values(**event(i)))
+
+
+def report(label: str, latencies, elapsed: float) -> None:
+    cuts = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<8} p50 {cuts[49] * 1e6:8.1f}us  p99 {cuts[98] * 1e6:8.1f}us  "
+        f"{len(latencies) / elapsed:10,.0f} events/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    audit_logs.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(delete(audit_logs))
+    print(f"{engine.dialect.name}, {args.events:,} events")
+
+    # Queue sized for the burst, as the default 10k is for steady traffic
+    audit_log._sink = AuditSink(DatabaseAuditWriter(engine), max_queue_size=args.events)
+    service = AuditService()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.events):
+        call = time.perf_counter()
+        service.log_survey_submission(str(i % 50), details=event(i)["details"])
+        latencies.append(time.perf_counter() - call)
+    audit_log._sink.close(timeout=None)
+    report("buffered", latencies, time.perf_counter() - start)
+    print(f"           {audit_log._sink.stats()}")
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.events):
+        call = time.perf_counter()
+        sync_log(i)
+        latencies.append(time.perf_counter() - call)
+    report("sync", latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark email delivery throughput for an invitation blast
+
+Sends the same messages one connection per message (how the handlers used
+to send inline: connect, LOGIN, send, QUIT) and through EmailOutbox
+(worker pool, persistent connections). By default a local aiosmtpd server
+(requirements/dev.txt) stands in for the relay, with --latency seconds
+added to each DATA to mimic a remote one; pass --smtp-host/--smtp-port to
+target another server instead.
+
+    python benchmarks/email_throughput.py --messages 2000 --workers 4 --latency 0.005
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.email import EmailOutbox, EmailService, SMTPConnection
+
+
+class CountingHandler:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.messages = 0
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages += 1
+        self.peers.add(session.peer)
+        return "250 OK"
+
+
+def start_standin(latency: float):
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+
+    handler = CountingHandler(latency)
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=0,
+        authenticator=lambda *args: AuthResult(success=True),
+        auth_require_tls=False
+    )
+    controller.start()
+    return controller, handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to each DATA by the stand-in")
+    parser.add_argument("--smtp-host")
+    parser.add_argument("--smtp-port", type=int, default=25)
+    args = parser.parse_args()
+
+    controller = handler = None
+    if args.smtp_host:
+        host, port = args.smtp_host, args.smtp_port
+    else:
+        controller, handler = start_standin(args.latency)
+        host, port = controller.hostname, controller.server.sockets[0].getsockname()[1]
+
+    def connect() -> SMTPConnection:
+        return SMTPConnection(host, port, "bench@novorasurveys.com", "bench", use_tls=False)
+
+    service = EmailService()
+    service.smtp_username = "bench@novorasurveys.com"
+    messages = [
+        service.build_message(
+            f"employee{i}@example.com",
+            "You're invited: Team pulse survey",
+            f"<p>Your survey link: https://novorasurveys.com/s/{i:08d}</p>",
+            f"Your survey link: https://novorasurveys.com/s/{i:08d}"
+        )
+        for i in range(args.messages)
+    ]
+    print(f"{args.messages:,} messages to {host}:{port}")
+
+    start = time.perf_counter()
+    for message in messages:
+        connection = connect()
+        connection.send(message)
+        connection.close()
+    elapsed = time.perf_counter() - start
+    print(f"  per-message connection  {elapsed:7.2f}s  {args.messages / elapsed:8.1f} msg/s")
+
+    outbox = EmailOutbox(connect, workers=args.workers, max_size=args.messages)
+    start = time.perf_counter()
+    for message in messages:
+        outbox.enqueue(message)
+    enqueued = time.perf_counter() - start
+    outbox.join()
+    elapsed = time.perf_counter() - start
+    outbox.close()
+    print(
+        f"  outbox, {args.workers} workers       {elapsed:7.2f}s  {args.messages / elapsed:8.1f} msg/s  "
+        f"(enqueue {enqueued / args.messages * 1e6:.1f}us/msg)  {outbox.stats()}"
+    )
+
+    if controller is not None:
+        controller.stop()
+        print(f"  stand-in received {handler.messages:,} messages over {len(handler.peers):,} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark minting invitation tokens for a survey launch
+
+Times InvitationService.mint_tokens (batched generation, COPY on asyncpg,
+executemany elsewhere) against the previous shape of a launch: a
+secrets.choice token per invitee written with its own INSERT.
+
+    DATABASE_URL=sqlite:////tmp/invites.db python benchmarks/invitation_minting.py --invitees 100000
+    DATABASE_URL=postgresql://localhost/novora_bench python benchmarks/invitation_minting.py --invitees 100000 --legacy
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.invitation_service import InvitationService, survey_tokens
+from app.services.token_generator import TokenGenerator
+
+SURVEY_ID = "bench-invitations"
+TEAMS = 200
+
+
+def team_sizes(invitees: int):
+    base, extra = divmod(invitees, TEAMS)
+    return {f"team-{i}": base + (1 if i < extra else 0) for i in range(TEAMS)}
+
+
+async def legacy_launch(sizes) -> int:
+    generator = TokenGenerator()
+    async with AsyncSessionLocal() as db:
+        for team_id, size in sizes.items():
+            for _ in range(size):
+                token = "".join(secrets.choice(generator.alphabet) for _ in range(generator.token_length))
+                await db.execute(insert(survey_tokens).values(
+                    token=token, survey_id=SURVEY_ID, team_id=team_id, used=False, created_at=datetime.utcnow()
+                ))
+        await db.commit()
+    return sum(sizes.values())
+
+
+async def bulk_launch(sizes) -> int:
+    def report(minted, total):
+        print(f"\r    {minted:>9,}/{total:,}", end="", flush=True)
+
+    async with AsyncSessionLocal() as db:
+        tokens = await InvitationService(db).mint_tokens(SURVEY_ID, sizes, progress=report)
+    print()
+    return sum(len(team_tokens) for team_tokens in tokens.values())
+
+
+async def reset() -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(survey_tokens.create, checkfirst=True)
+        await conn.execute(delete(survey_tokens).where(survey_tokens.c.survey_id == SURVEY_ID))
+
+
+async def stored() -> int:
+    async with async_engine.connect() as conn:
+        return await conn.scalar(select(func.count()).where(survey_tokens.c.survey_id == SURVEY_ID))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--invitees", type=int, default=100000)
+    parser.add_argument("--legacy", action="store_true", help="Also time one INSERT per invitee")
+    args = parser.parse_args()
+
+    sizes = team_sizes(args.invitees)
+    variants = [("bulk", bulk_launch)]
+    if args.legacy:
+        variants.append(("legacy", legacy_launch))
+
+    print(f"{async_engine.dialect.name}, {args.invitees:,} invitees across {TEAMS} teams")
+    for label, launch in variants:
+        await reset()
+        start = time.perf_counter()
+        minted = await launch(sizes)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<8} {elapsed:8.2f}s  {minted / elapsed:10,.0f} tokens/s  stored {await stored():,}")
+    await reset()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Load-test token-validated survey submissions (submissions/sec)
+
+Runs the same workload through the previous route logic (validate_survey_token
+and mark_token_used on the sync facade, one commit each, then per-answer
+session adds) and through SubmissionService (one claim UPDATE ... RETURNING,
+bulk insert, one commit). Each submission uses a fresh token, and a pool of
+concurrent clients keeps the database busy.
+
+Needs a database migrated to the app schema, with one active survey, its
+drivers, and a team:
+
+    DATABASE_URL=postgresql://localhost/novora_bench python benchmarks/submission_throughput.py \\
+        --survey-id 1 --team-id <team uuid> --driver-id <uuid> --driver-id <uuid>
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+
+from app.core.database import AsyncSessionLocal
+from app.core.token_validation import mark_token_used, validate_survey_token
+from app.models.base import SurveyToken
+from app.models.responses import NumericResponse
+from app.services.submission_service import SubmissionService
+
+
+async def legacy_submit(survey_id: str, token: str, driver_ids, fingerprint: str) -> None:
+    async with AsyncSessionLocal() as db:
+        team_id = await db.run_sync(
+            lambda sync_db: validate_survey_token(token, survey_id, sync_db, device_fingerprint=fingerprint)
+        )
+        await db.run_sync(lambda sync_db: mark_token_used(token, sync_db))
+        for driver_id in driver_ids:
+            db.add(NumericResponse(survey_id=survey_id, team_id=team_id, driver_id=driver_id, score=7))
+        await db.commit()
+
+
+async def service_submit(survey_id: str, token: str, driver_ids, fingerprint: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await SubmissionService(db).submit(
+            survey_id,
+            token,
+            scores=[(driver_id, 7) for driver_id in driver_ids],
+            device_fingerprint=fingerprint
+        )
+
+
+async def seed_tokens(survey_id: str, team_id: str, count: int):
+    tokens = [secrets.token_urlsafe(24) for _ in range(count)]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(SurveyToken), [
+            {"token": token, "survey_id": survey_id, "team_id": team_id, "used": False}
+            for token in tokens
+        ])
+        await db.commit()
+    return tokens
+
+
+async def cleanup(survey_id: str, tokens) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(SurveyToken).where(SurveyToken.token.in_(tokens)))
+        await db.execute(delete(NumericResponse).where(NumericResponse.survey_id == survey_id))
+        await db.commit()
+
+
+async def run(label: str, submit, args) -> None:
+    tokens = await seed_tokens(args.survey_id, args.team_id, args.submissions)
+    queue = asyncio.Queue()
+    for token in tokens:
+        queue.put_nowait(token)
+
+    async def client() -> None:
+        # A fresh fingerprint per submission keeps the device throttles out
+        # of the way; they would otherwise trip after 10 tokens per client
+        while not queue.empty():
+            await submit(args.survey_id, queue.get_nowait(), args.driver_id, uuid.uuid4().hex)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {args.submissions} submissions in {elapsed:6.2f}s  {args.submissions / elapsed:8.1f}/s")
+
+    await cleanup(args.survey_id, tokens)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--survey-id", required=True)
+    parser.add_argument("--team-id", required=True)
+    parser.add_argument("--driver-id", action="append", required=True, help="Repeat for each scored driver")
+    parser.add_argument("--submissions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    await run("legacy route", legacy_submit, args)
+    await run("SubmissionService", service_submit, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
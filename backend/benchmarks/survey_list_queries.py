@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Check that listing surveys costs a fixed number of queries
+
+Seeds surveys with questions, attachments and responses, then calls
+fetch_survey_dicts (what GET /surveys and GET /surveys/{id} serve) for
+growing page sizes. It counts the statements each call sends and fails
+if any call exceeds MAX_QUERIES, and it reports the latency.
+
+    DATABASE_URL=sqlite:////tmp/surveys.db python benchmarks/survey_list_queries.py --surveys 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, insert
+
+from app.api.v1.endpoints.surveys import (
+    attachments_table, fetch_survey_dicts, questions_table, responses_table, surveys_table
+)
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.base import User
+
+MAX_QUERIES = 3
+QUESTIONS_PER_SURVEY = 12
+CREATOR_ID = 1
+users_table = User.__table__
+
+
+async def seed(count: int) -> None:
+    now = datetime.utcnow()
+    async with async_engine.begin() as conn:
+        for table in (users_table, surveys_table, questions_table, attachments_table, responses_table):
+            await conn.run_sync(table.create, checkfirst=True)
+        for table in (responses_table, attachments_table, questions_table, surveys_table, users_table):
+            await conn.execute(delete(table))
+
+        await conn.execute(insert(users_table).values(
+            id=CREATOR_ID, email="bench@novorasurveys.com", password_hash="x", created_at=now
+        ))
+        await conn.execute(insert(surveys_table), [
+            {"id": i, "title": f"Survey {i}", "creator_id": CREATOR_ID, "status": "active",
+             "is_anonymous": True, "allow_comments": False, "category": "general",
+             "created_at": now, "updated_at": now}
+            for i in range(1, count + 1)
+        ])
+        await conn.execute(insert(questions_table), [
+            {"survey_id": i, "text": f"Question {q}", "type": "rating", "required": True, "order": q,
+             "options": None, "allow_comments": False}
+            for i in range(1, count + 1) for q in range(QUESTIONS_PER_SURVEY)
+        ])
+        await conn.execute(insert(attachments_table), [
+            {"survey_id": i, "filename": f"f{i}.pdf", "original_filename": "brief.pdf", "file_path": f"/u/f{i}.pdf",
+             "file_size": 1024, "mime_type": "application/pdf", "uploaded_by": CREATOR_ID, "uploaded_at": now}
+            for i in range(1, count + 1, 3)
+        ])
+        await conn.execute(insert(responses_table), [
+            {"survey_id": i, "submitted_at": now, "completed": True}
+            for i in range(1, count + 1) for _ in range(i % 7)
+        ])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--surveys", type=int, default=500)
+    args = parser.parse_args()
+
+    await seed(args.surveys)
+    statements = []
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    print(f"{async_engine.dialect.name}, {args.surveys:,} surveys x {QUESTIONS_PER_SURVEY} questions")
+    failed = False
+    for page_size in sorted({1, 10, 100, args.surveys}):
+        async with AsyncSessionLocal() as db:
+            statements.clear()
+            start = time.perf_counter()
+            surveys = await fetch_survey_dicts(db, surveys_table.c.creator_id == CREATOR_ID, limit=page_size)
+            elapsed = time.perf_counter() - start
+        queries = len(statements)
+        failed |= queries > MAX_QUERIES
+        assert len(surveys) == page_size
+        assert all(len(survey["questions"]) == QUESTIONS_PER_SURVEY for survey in surveys)
+        assert all(survey["response_count"] == survey["id"] % 7 for survey in surveys)
+        print(f"  {page_size:>6} surveys  {queries} queries  {elapsed * 1000:8.1f}ms")
+
+    if failed:
+        sys.exit(f"FAILED: a listing issued more than {MAX_QUERIES} queries")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
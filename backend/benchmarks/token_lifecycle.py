@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark survey-token lifecycle operations at 10^5-10^6 tokens
+
+Seeds one survey's worth of tokens into survey_tokens, then times
+get_token_usage_stats, auto_expire_tokens and cleanup_expired_tokens and
+reports peak Python memory for each. --legacy also runs the previous
+ORM implementations (three COUNTs, load-and-mutate every token, one
+unbounded DELETE) for comparison.
+
+    DATABASE_URL=sqlite:////tmp/tokens.db python benchmarks/token_lifecycle.py --tokens 100000
+    DATABASE_URL=postgresql://localhost/novora_bench python benchmarks/token_lifecycle.py --tokens 1000000 --legacy
+"""
+import argparse
+import os
+import secrets
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, update
+
+from app.core.database import SessionLocal, engine
+from app.core.token_validation import (
+    auto_expire_tokens, cleanup_expired_tokens, get_token_usage_stats, survey_tokens
+)
+
+SURVEY_ID = "bench-token-lifecycle"
+SEED_CHUNK = 50000
+
+
+def legacy_usage_stats(survey_id, db):
+    from app.models.base import SurveyToken
+
+    total = db.query(SurveyToken).filter(SurveyToken.survey_id == survey_id).count()
+    used = db.query(SurveyToken).filter(SurveyToken.survey_id == survey_id, SurveyToken.used == True).count()
+    failed = db.query(SurveyToken).filter(SurveyToken.survey_id == survey_id, SurveyToken.attempt_failed == True).count()
+    return {"total_tokens": total, "used_tokens": used, "failed_attempts": failed}
+
+
+def legacy_auto_expire(survey_id, db):
+    from app.models.base import SurveyToken
+
+    tokens = db.query(SurveyToken).filter(SurveyToken.survey_id == survey_id, SurveyToken.used == False).all()
+    for token in tokens:
+        token.used = True
+        token.used_at = datetime.utcnow()
+        token.expired_at = datetime.utcnow()
+        token.expired_reason = "survey_closed"
+    db.commit()
+    return len(tokens)
+
+
+def legacy_cleanup(db, days_old=30):
+    from app.models.base import SurveyToken
+
+    cutoff = datetime.utcnow() - timedelta(days=days_old)
+    count = db.query(SurveyToken).filter(
+        SurveyToken.expired_at.isnot(None), SurveyToken.expired_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+
+def seed(count: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(delete(survey_tokens).where(survey_tokens.c.survey_id == SURVEY_ID))
+        for start in range(0, count, SEED_CHUNK):
+            conn.execute(insert(survey_tokens), [
+                {
+                    "token": secrets.token_hex(16),
+                    "survey_id": SURVEY_ID,
+                    "team_id": f"team-{i % 50}",
+                    "used": i % 3 == 0,
+                    "attempt_failed": i % 17 == 0
+                }
+                for i in range(start, min(start + SEED_CHUNK, count))
+            ])
+
+
+def age_expired_tokens() -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            update(survey_tokens)
+            .where(survey_tokens.c.survey_id == SURVEY_ID)
+            .values(expired_at=datetime.utcnow() - timedelta(days=60))
+        )
+
+
+def timed(label: str, fn):
+    db = SessionLocal()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(db)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.close()
+    print(f"  {label:<10} {elapsed:8.3f}s  peak {peak / 2**20:7.1f} MiB  -> {result}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument("--legacy", action="store_true", help="Also time the previous ORM implementations")
+    args = parser.parse_args()
+
+    survey_tokens.create(engine, checkfirst=True)
+    variants = [("bulk", get_token_usage_stats, auto_expire_tokens, cleanup_expired_tokens)]
+    if args.legacy:
+        variants.append(("legacy", legacy_usage_stats, legacy_auto_expire, legacy_cleanup))
+
+    print(f"{engine.dialect.name}, {args.tokens:,} tokens")
+    for label, stats, expire, cleanup in variants:
+        seed(args.tokens)
+        print(f"\n{label}:")
+        timed("stats", lambda db: stats(SURVEY_ID, db))
+        timed("expire", lambda db: expire(SURVEY_ID, db))
+        age_expired_tokens()
+        timed("cleanup", lambda db: cleanup(db))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark JSON serialization on GET /api/v1/surveys
+
+Runs the same request through the Flask test client serializing with the
+stdlib json module, with orjson (when installed), and from the compiled
+survey cache, and reports the per-request time of each. The first two modes
+clear the survey cache before every request.
+
+    python benchmarks/json_serialization.py --surveys 200 --requests 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--surveys', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    sys.path.insert(0, ROOT)
+    import main as mvp
+
+    client = mvp.app.test_client()
+    token = client.post('/api/v1/auth/register', json={
+        'email': f'json-bench-{os.getpid()}@example.com', 'password': 'secret'
+    }).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    questions = [{'id': f'q{i}', 'type': 'rating', 'text': f'Question {i}', 'scale': [1, 10]} for i in range(10)]
+    for i in range(args.surveys):
+        client.post('/api/v1/surveys', headers=headers, json={'title': f'Survey {i}', 'questions': questions})
+
+    fast_json = mvp.orjson
+    modes = {'stdlib': (None, True), 'orjson': (fast_json, True), 'compiled': (fast_json, False)}
+    timings = {}
+    for name, (json_module, uncached) in modes.items():
+        if name == 'orjson' and fast_json is None:
+            continue
+        mvp.orjson = json_module
+        client.get('/api/v1/surveys', headers=headers)  # warm up
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            if uncached:
+                mvp.survey_cache.clear()
+            body = client.get('/api/v1/surveys', headers=headers).data
+        timings[name] = (time.perf_counter() - start) / args.requests * 1000
+
+    print(f"GET /api/v1/surveys with {args.surveys} surveys ({len(body)} bytes)")
+    for name, ms in timings.items():
+        print(f"  {name:8} {ms:.3f} ms/request  (saves {timings['stdlib'] - ms:.3f} ms vs stdlib)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Flask MVP routes against SQLite and PostgreSQL
+
+Each backend runs in its own process because main.py reads DATABASE_URL at
+import time. PostgreSQL is only benchmarked when a URL is given, e.g.
+
+    python benchmarks/mvp_backends.py --postgres postgresql://localhost/novora_bench
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_routes(requests, threads):
+    """Drive the MVP routes through the Flask test client and report requests/sec"""
+    sys.path.insert(0, ROOT)
+    import main
+
+    client = main.app.test_client()
+    results = {}
+
+    def timed(name, count, call):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(call, range(count)))
+        elapsed = time.perf_counter() - start
+        failures = sum(1 for status in statuses if status != 200)
+        results[name] = {'req_per_sec': round(count / elapsed, 1), 'failures': failures}
+
+    run_id = os.getpid()
+    timed('register', requests, lambda i: client.post('/api/v1/auth/register', json={
+        'email': f'bench-{run_id}-{i}@example.com', 'password': 'secret'
+    }).status_code)
+
+    token = client.post('/api/v1/auth/register', json={
+        'email': f'bench-{run_id}-owner@example.com', 'password': 'secret'
+    }).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    survey = client.post('/api/v1/surveys', headers=headers, json={
+        'title': 'Benchmark survey',
+        'questions': [{'id': 'q1', 'type': 'rating'}],
+        'max_submissions': requests * 10
+    }).get_json()['survey']
+
+    timed('create_survey', requests // 10 or 1, lambda i: client.post(
+        '/api/v1/surveys', headers=headers, json={'title': f'Survey {i}'}
+    ).status_code)
+    timed('list_surveys', requests, lambda i: client.get(
+        '/api/v1/surveys', headers=headers
+    ).status_code)
+    timed('submit_response', requests, lambda i: client.post(
+        f"/api/v1/surveys/{survey['survey_token']}/responses", json={'responses': {'q1': i % 11}}
+    ).status_code)
+    timed('get_responses', requests // 10 or 1, lambda i: client.get(
+        f"/api/v1/surveys/{survey['id']}/responses", headers=headers
+    ).status_code)
+
+    results['pool'] = client.get('/api/v1/health/db').get_json()['pool']
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--postgres', help='PostgreSQL URL to benchmark as well')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_routes(args.requests, args.threads)))
+        return
+
+    backends = {'sqlite': f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"}
+    if args.postgres:
+        backends['postgresql'] = args.postgres
+
+    for name, url in backends.items():
+        output = subprocess.run(
+            [sys.executable, __file__, '--worker', '--requests', str(args.requests), '--threads', str(args.threads)],
+            env={**os.environ, 'DATABASE_URL': url},
+            capture_output=True, text=True, check=True
+        ).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        print(f"== {name} ({args.requests} requests, {args.threads} threads)")
+        for route, numbers in results.items():
+            print(f"  {route:16} {numbers}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark group-committed response inserts against one commit per response
+
+Only the write path is measured, without Flask in front of it, so the
+difference is the fsync cost saved per submission. Point --dir at the disk
+the production database lives on; tmpfs hides fsync cost entirely.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--submissions', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--dir', default=None, help='directory for the benchmark database')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(dir=args.dir), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, ROOT)
+    import main as mvp
+
+    # One survey with no submission limit for every response to land in
+    conn = mvp.connect_sqlite(db_path)
+    survey_id = conn.execute(
+        "INSERT INTO surveys (title, max_submissions) VALUES ('Benchmark', NULL) RETURNING id"
+    ).fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    response_data = {'q1': 7, 'q2': 'Great team'}
+    local = threading.local()
+
+    def commit_per_response(i):
+        if not hasattr(local, 'conn'):
+            local.conn = mvp.connect_sqlite(db_path)
+            local.conn.execute("PRAGMA synchronous=FULL")
+        cursor = local.conn.cursor()
+        cursor.execute(mvp.SubmissionWriter.CLAIM_SQL, (survey_id,))
+        cursor.fetchone()
+        cursor.execute(mvp.SubmissionWriter.INSERT_SQL, (survey_id, 1, json.dumps(response_data), None))
+        response_id = cursor.fetchone()[0]
+        cursor.executemany(mvp.SubmissionWriter.INSERT_ANSWER_SQL, [
+            (response_id, survey_id) + answer for answer in mvp.extract_answers(response_data)
+        ])
+        local.conn.commit()
+
+    writer = mvp.get_submission_writer()
+
+    def group_commit(i):
+        writer.submit(survey_id, 1, response_data)
+
+    for name, call in (('commit per response', commit_per_response), ('group commit', group_commit)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            list(executor.map(call, range(args.submissions)))
+        elapsed = time.perf_counter() - start
+        print(f"{name:20} {args.submissions / elapsed:10.1f} submits/sec")
+
+    print(f"writer stats         {writer.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -3,16 +3,78 @@
 Novora MVP Flask API with Authentication
 """
 import os
+import atexit
+import itertools
+import re
 import sqlite3
 import hashlib
 import secrets
+import sys
 import json
-from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+import queue
+import threading
+import time
+from collections import OrderedDict, namedtuple
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import Flask, request, jsonify, g, Response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import jwt
 
+try:
+    import psycopg2
+    import psycopg2.extras
+except ImportError:  # SQLite-only deployments
+    psycopg2 = None
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+def json_default(obj):
+    """Serialize the types the database layer hands back that JSON lacks"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_json(obj, sort_keys=False):
+    """Serialize obj to compact UTF-8 JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(obj, default=json_default, sort_keys=sort_keys,
+                      ensure_ascii=False, separators=(',', ':')).encode()
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps_json
+
+    jsonify() builds the response body straight from bytes; dates are
+    rendered as ISO 8601 on both the SQLite and PostgreSQL backends.
+    """
+
+    default = staticmethod(json_default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_json(obj, self.sort_keys).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj, self.sort_keys), mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app, origins=[
     "https://novorasurveys.com",
     "https://novora-static.vercel.app", 
@@ -24,11 +86,46 @@ CORS(app, origins=[
 # Configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 DATABASE_URL = os.environ.get('DATABASE_URL')
+USE_POSTGRES = bool(DATABASE_URL and DATABASE_URL.startswith(('postgres://', 'postgresql://')))
+if USE_POSTGRES and psycopg2 is None:
+    print("psycopg2 is not installed - falling back to SQLite")
+    USE_POSTGRES = False
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+SUBMIT_BATCH_WINDOW_MS = float(os.environ.get('SUBMIT_BATCH_WINDOW_MS', '0'))
+SUBMIT_BATCH_MAX = int(os.environ.get('SUBMIT_BATCH_MAX', '500'))
+SUBMIT_QUEUE_MAX = int(os.environ.get('SUBMIT_QUEUE_MAX', '10000'))
+SUBMIT_COMMIT_TIMEOUT = float(os.environ.get('SUBMIT_COMMIT_TIMEOUT', '10'))
+RESPONSES_PAGE_SIZE = int(os.environ.get('RESPONSES_PAGE_SIZE', '100'))
+RESPONSES_PAGE_MAX = int(os.environ.get('RESPONSES_PAGE_MAX', '1000'))
+RESPONSES_STREAM_CHUNK = int(os.environ.get('RESPONSES_STREAM_CHUNK', '500'))
+JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', '10000'))
+JWT_CACHE_TTL = float(os.environ.get('JWT_CACHE_TTL', '300'))
+SESSION_FLUSH_INTERVAL = float(os.environ.get('SESSION_FLUSH_INTERVAL', '5'))
+SESSION_FLUSH_MAX = int(os.environ.get('SESSION_FLUSH_MAX', '500'))
+SESSION_SWEEP_INTERVAL = float(os.environ.get('SESSION_SWEEP_INTERVAL', '3600'))
+SURVEY_TOKEN_CACHE_SIZE = int(os.environ.get('SURVEY_TOKEN_CACHE_SIZE', '10000'))
+SURVEY_TOKEN_CACHE_TTL = float(os.environ.get('SURVEY_TOKEN_CACHE_TTL', '300'))
+SURVEY_CACHE_SIZE = int(os.environ.get('SURVEY_CACHE_SIZE', '5000'))
+PG_STATEMENT_CACHE_SIZE = int(os.environ.get('PG_STATEMENT_CACHE_SIZE', '256'))  # prepared statements kept per connection
+SURVEY_LINK_BASE = os.environ.get('SURVEY_LINK_BASE', 'https://novorasurveys.com/survey/')
+
+# Applied to every SQLite connection the API opens
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # readers no longer block the writer
+    f"PRAGMA synchronous={os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+    "PRAGMA cache_size=-16384",  # 16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",  # 128 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
 
 def get_db_path():
     """Get database path - use production DB if available, otherwise local"""
-    if DATABASE_URL and 'postgresql' in DATABASE_URL:
+    if USE_POSTGRES:
         return None  # Use PostgreSQL in production
+    elif DATABASE_URL and DATABASE_URL.startswith('sqlite:///'):
+        return DATABASE_URL[len('sqlite:///'):]
     else:
         # Use local SQLite for development
         local_path = 'backend/mvp_surveys.db'
@@ -36,19 +133,725 @@ def get_db_path():
             return local_path
         return 'mvp_surveys.db'
 
-def init_database():
-    """Initialize database with required tables"""
+def connect_sqlite(db_path):
+    """Open a SQLite connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=5.0,
+        check_same_thread=False,  # pooled connections move between threads
+        cached_statements=256  # prepared statements kept per connection
+    )
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _rewrite_placeholders(sql, placeholder):
+    """Replace sqlite-style ? placeholders with placeholder(index), 1-based
+
+    Question marks inside quoted literals, quoted identifiers and comments
+    are left alone. Returns the rewritten SQL and the number replaced.
+    """
+    out = []
+    count = 0
+    i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if char in ("'", '"'):
+            # Quoted literal or identifier; a doubled quote is an escaped one
+            end = i + 1
+            while end < length:
+                if sql[end] == char:
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            out.append(sql[i:end + 1])
+            i = end + 1
+        elif sql.startswith('--', i):
+            end = sql.find('\n', i)
+            end = length if end == -1 else end
+            out.append(sql[i:end])
+            i = end
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            out.append(sql[i:end])
+            i = end
+        elif char == '?':
+            count += 1
+            out.append(placeholder(count))
+            i += 1
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out), count
+
+def _numbered_placeholders(sql):
+    """Rewrite sqlite-style ? placeholders as PostgreSQL $1, $2, ..."""
+    return _rewrite_placeholders(sql, lambda index: f"${index}")[0]
+
+def _pyformat_placeholders(sql):
+    """Rewrite sqlite-style ? placeholders as psycopg2 %s, escaping literal %"""
+    return _rewrite_placeholders(sql.replace('%', '%%'), lambda index: '%s')[0]
+
+# IN lists built with one placeholder per value produce a different SQL string
+# for every length; preparing them would only churn the statement cache
+_DYNAMIC_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+
+# Only these statements can be PREPAREd; transaction control such as
+# SAVEPOINT and RELEASE runs as-is
+_PREPARABLE = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|VALUES|WITH)\b", re.IGNORECASE)
+
+class PostgresCursor:
+    """sqlite3-style cursor that runs every statement as a server-side prepared statement"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+
+    def execute(self, sql, params=()):
+        name = self._conn.prepare(self._cursor, sql)
+        if name is None:
+            if params:
+                self._cursor.execute(_pyformat_placeholders(sql), tuple(params))
+            else:
+                self._cursor.execute(sql)
+            return self
+        if params:
+            placeholders = ', '.join(['%s'] * len(params))
+            self._cursor.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+        else:
+            self._cursor.execute(f"EXECUTE {name}")
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = [tuple(params) for params in seq_of_params]
+        if not seq_of_params:
+            return self
+        name = self._conn.prepare(self._cursor, sql)
+        if name is None:
+            psycopg2.extras.execute_batch(self._cursor, _pyformat_placeholders(sql), seq_of_params)
+            return self
+        placeholders = ', '.join(['%s'] * len(seq_of_params[0]))
+        psycopg2.extras.execute_batch(self._cursor, f"EXECUTE {name} ({placeholders})", seq_of_params)
+        return self
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+class PostgresConnection:
+    """psycopg2 connection exposing the subset of the sqlite3 API the routes use
+
+    Each distinct SQL string is PREPAREd once per connection and executed by
+    name afterwards, so PostgreSQL plans it only once. At most
+    PG_STATEMENT_CACHE_SIZE statements stay prepared; the least recently used
+    is DEALLOCATEd to make room. SQL with a variable-length IN list runs
+    unprepared.
+    """
+
+    def __init__(self, raw, cache_size=None):
+        self.raw = raw
+        self._statements = OrderedDict()
+        self._cache_size = cache_size or PG_STATEMENT_CACHE_SIZE
+        self._names = itertools.count()
+
+    def prepare(self, cursor, sql):
+        """Name of the prepared statement for sql, or None to run it unprepared"""
+        name = self._statements.get(sql)
+        if name is not None:
+            self._statements.move_to_end(sql)
+            return name
+        if not _PREPARABLE.match(sql) or _DYNAMIC_IN_LIST.search(sql):
+            return None
+        
+        while len(self._statements) >= self._cache_size:
+            _, evicted = self._statements.popitem(last=False)
+            cursor.execute(f"DEALLOCATE {evicted}")
+        name = f"mvp_stmt_{next(self._names)}"
+        cursor.execute(f"PREPARE {name} AS {_numbered_placeholders(sql)}")
+        self._statements[sql] = name
+        return name
+
+    def cursor(self):
+        return PostgresCursor(self)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+def connect_postgres():
+    """Open a PostgreSQL connection for the pool"""
+    return PostgresConnection(psycopg2.connect(DATABASE_URL, connect_timeout=5))
+
+class ConnectionPool:
+    """Bounded pool of long-lived database connections for one worker process
+
+    Connections stay open between requests, so the schema is parsed once per
+    connection and the per-connection statement cache stays warm.
+    """
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+        self._connect = connect
+        self._size = size
+        self._timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._waited = 0
+        self._timeouts = 0
+
+    def acquire(self):
+        """Check out an idle connection, opening one while below the pool size"""
+        with self._lock:
+            self._acquired += 1
+        
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_open = self._opened < self._size
+            if can_open:
+                self._opened += 1
+            else:
+                self._waited += 1
+        
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise RuntimeError('Database connection pool exhausted')
+
+    def release(self, conn):
+        """Return a connection, discarding anything the caller left uncommitted"""
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def stats(self):
+        """Snapshot of pool usage counters"""
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'size': self._size,
+                'opened': self._opened,
+                'idle': idle,
+                'in_use': self._opened - idle,
+                'acquired': self._acquired,
+                'waited': self._waited,
+                'timeouts': self._timeouts
+            }
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Get this worker's connection pool, creating it lazily after fork"""
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                db_path = get_db_path()
+                if db_path:
+                    _pool = ConnectionPool(lambda: connect_sqlite(db_path))
+                else:
+                    _pool = ConnectionPool(connect_postgres)
+                _pool_pid = os.getpid()
+    return _pool
+
+def get_db():
+    """Get the pooled connection for the current request"""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception):
+    """Hand the request's connection back to the pool"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def extract_answers(response_data):
+    """Flatten a {question_id: value} submission into (question_id, numeric_value, text_value) rows"""
+    answers = []
+    if not isinstance(response_data, dict):
+        return answers
+    for question_id, value in response_data.items():
+        numeric_value = None
+        text_value = None
+        if isinstance(value, bool):
+            numeric_value = float(value)
+        elif isinstance(value, (int, float)):
+            numeric_value = float(value)
+        elif isinstance(value, str):
+            try:
+                numeric_value = float(value)
+            except ValueError:
+                text_value = value
+        elif value is not None:
+            text_value = json.dumps(value)
+        answers.append((str(question_id), numeric_value, text_value))
+    return answers
+
+class SurveyFull(Exception):
+    """The survey has reached its max_submissions"""
+
+class SurveyNotFound(Exception):
+    """The survey was deleted after its token was resolved"""
+
+class SubmissionQueueFull(Exception):
+    """Raised when the submission writer cannot accept more work"""
+    pass
+
+class SubmissionPending(Exception):
+    """The submission is queued but its commit did not finish in time
+
+    It may still commit; retrying with the same submission key is safe.
+    """
+
+    def __init__(self, submission_key):
+        super().__init__('Response accepted and is still being saved')
+        self.submission_key = submission_key
+
+class _PendingSubmission:
+    __slots__ = ('params', 'done', 'error', 'duplicate')
+
+    def __init__(self, params):
+        self.params = params
+        self.done = threading.Event()
+        self.error = None
+        self.duplicate = False
+
+class SubmissionWriter:
+    """Group-commit writer for public survey responses
+
+    One background thread writes everything that queued up while the
+    previous commit was being fsynced in a single transaction, optionally
+    waiting SUBMIT_BATCH_WINDOW_MS for stragglers, so a burst costs one fsync
+    per batch instead of one per response. Each response is claimed and
+    inserted row by row (it needs its own claim and RETURNING id), with its
+    answers in one executemany, under its own savepoint so a failing row is
+    rolled back alone. Callers block until their batch has committed, so a 200
+    is only sent for durable rows.
+
+    Every submission carries a key stored on its response row. A key that is
+    already stored is reported as a duplicate instead of being saved again,
+    which makes retrying a timed-out submission safe.
+    """
+
+    # Checks the limit and counts the submission in one statement; the row
+    # lock serializes concurrent submitters across workers
+    CLAIM_SQL = """
+        UPDATE surveys
+        SET current_submissions = current_submissions + 1
+        WHERE id = ? AND (max_submissions IS NULL OR current_submissions < max_submissions)
+        RETURNING current_submissions
+    """
+    INSERT_SQL = """
+        INSERT INTO responses (survey_id, user_id, response_data, submission_key)
+        VALUES (?, ?, ?, ?)
+        RETURNING id
+    """
+    EXISTING_SQL = "SELECT id FROM responses WHERE submission_key = ?"
+    INSERT_ANSWER_SQL = """
+        INSERT INTO response_answers (response_id, survey_id, question_id, numeric_value, text_value)
+        VALUES (?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, connect, window_ms=SUBMIT_BATCH_WINDOW_MS, max_batch=SUBMIT_BATCH_MAX,
+                 max_queue=SUBMIT_QUEUE_MAX):
+        self._connect = connect
+        self._window = window_ms / 1000.0
+        self._max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._submitted = 0
+        self._committed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._duplicates = 0
+        self._batches = 0
+        self._commit_ms_total = 0.0
+        self._commit_ms_max = 0.0
+        self._commit_ms_last = 0.0
+
+    def submit(self, survey_id, user_id, response_data, submission_key=None, timeout=SUBMIT_COMMIT_TIMEOUT):
+        """Queue one response and wait until the transaction holding it commits
+
+        Returns the submission key, and whether it had already been saved.
+        Raises SubmissionPending if the commit does not finish within timeout.
+        """
+        self._ensure_started()
+        submission_key = submission_key or uuid.uuid4().hex
+        pending = _PendingSubmission(
+            (survey_id, user_id, json.dumps(response_data), extract_answers(response_data), submission_key)
+        )
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            raise SubmissionQueueFull('Too many submissions in flight, please retry')
+        with self._lock:
+            self._submitted += 1
+        
+        if not pending.done.wait(timeout):
+            raise SubmissionPending(submission_key)
+        if pending.error is not None:
+            raise pending.error
+        return submission_key, pending.duplicate
+
+    def stats(self):
+        """Queue depth and commit latency counters"""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'submitted': self._submitted,
+                'committed': self._committed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'duplicates': self._duplicates,
+                'batches': self._batches,
+                'avg_batch_size': round(self._committed / self._batches, 2) if self._batches else 0,
+                'commit_ms_avg': round(self._commit_ms_total / self._batches, 3) if self._batches else 0,
+                'commit_ms_max': round(self._commit_ms_max, 3),
+                'commit_ms_last': round(self._commit_ms_last, 3)
+            }
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+                    self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch:
+            try:
+                # Take everything already queued before waiting for stragglers
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_one(self, cursor, pending):
+        """Claim and insert one response and its answers; False for a duplicate key"""
+        survey_id, user_id, response_data, answers, submission_key = pending.params
+        cursor.execute(self.EXISTING_SQL, (submission_key,))
+        if cursor.fetchone() is not None:
+            return False
+        cursor.execute(self.CLAIM_SQL, (survey_id,))
+        if cursor.fetchone() is None:
+            # Another worker may have deleted it while its token stayed cached here
+            cursor.execute("SELECT 1 FROM surveys WHERE id = ?", (survey_id,))
+            if cursor.fetchone() is None:
+                raise SurveyNotFound('Survey not found')
+            raise SurveyFull('Survey has reached its maximum number of submissions')
+        cursor.execute(self.INSERT_SQL, (survey_id, user_id, response_data, submission_key))
+        response_id = cursor.fetchone()[0]
+        cursor.executemany(self.INSERT_ANSWER_SQL, [
+            (response_id, survey_id, question_id, numeric_value, text_value)
+            for question_id, numeric_value, text_value in answers
+        ])
+        return True
+
+    def _run(self):
+        conn = None
+        integrity_errors = (sqlite3.IntegrityError,)
+        if USE_POSTGRES:
+            integrity_errors += (psycopg2.IntegrityError,)
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            error = None
+            for pending in batch:
+                pending.error = None
+                pending.duplicate = False
+            try:
+                if conn is None:
+                    conn = self._connect()
+                cursor = conn.cursor()
+                if isinstance(conn, sqlite3.Connection) and not conn.in_transaction:
+                    # Otherwise the first SAVEPOINT would open the transaction
+                    # and releasing it would commit each row on its own
+                    cursor.execute("BEGIN")
+                for pending in batch:
+                    cursor.execute("SAVEPOINT submission")
+                    try:
+                        pending.duplicate = not self._write_one(cursor, pending)
+                        cursor.execute("RELEASE SAVEPOINT submission")
+                    except Exception as e:
+                        # Undo this row's claim and inserts, keep the rest of the batch
+                        cursor.execute("ROLLBACK TO SAVEPOINT submission")
+                        cursor.execute("RELEASE SAVEPOINT submission")
+                        pending.error = e
+                        if isinstance(e, integrity_errors):
+                            cursor.execute(self.EXISTING_SQL, (pending.params[4],))
+                            if cursor.fetchone() is not None:
+                                # Another writer saved the same key first
+                                pending.error = None
+                                pending.duplicate = True
+                conn.commit()
+            except Exception as e:
+                error = e
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None  # reconnect for the next batch
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            if error is not None:
+                for pending in batch:
+                    pending.error = error
+            rejected = sum(1 for pending in batch if isinstance(pending.error, (SurveyFull, SurveyNotFound)))
+            failed = sum(1 for pending in batch if pending.error is not None) - rejected
+            duplicates = sum(1 for pending in batch if pending.duplicate and pending.error is None)
+            
+            with self._lock:
+                self._batches += 1
+                self._commit_ms_total += elapsed_ms
+                self._commit_ms_max = max(self._commit_ms_max, elapsed_ms)
+                self._commit_ms_last = elapsed_ms
+                self._committed += len(batch) - rejected - failed - duplicates
+                self._rejected += rejected
+                self._failed += failed
+                self._duplicates += duplicates
+            
+            for pending in batch:
+                pending.done.set()
+
+def connect_submission_writer():
+    """Open the writer's dedicated connection, fsyncing every commit on SQLite"""
     db_path = get_db_path()
     if not db_path:
-        return  # Skip for PostgreSQL
+        return connect_postgres()
+    conn = connect_sqlite(db_path)
+    conn.execute("PRAGMA synchronous=FULL")
+    return conn
+
+_submission_writer = None
+_submission_writer_pid = None
+
+def get_submission_writer():
+    """Get this worker's submission writer, creating it lazily after fork"""
+    global _submission_writer, _submission_writer_pid
+    if _submission_writer_pid != os.getpid():
+        with _pool_lock:
+            if _submission_writer_pid != os.getpid():
+                _submission_writer = SubmissionWriter(connect_submission_writer)
+                _submission_writer_pid = os.getpid()
+    return _submission_writer
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with per-entry expiry
+
+    Every worker process keeps its own copy, so entries also expire after
+    ``ttl`` seconds to bound staleness when another worker changes the data.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+            self._misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        ttl = self._ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self._maxsize,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+# survey_token -> (survey_id, user_id) for the public submit path
+survey_token_cache = LRUCache(SURVEY_TOKEN_CACHE_SIZE, ttl=SURVEY_TOKEN_CACHE_TTL)
+
+def resolve_survey_token(survey_token):
+    """Map a public survey token to (survey_id, user_id), or None if unknown
+
+    Cache hits never check a connection out of the pool.
+    """
+    survey = survey_token_cache.get(survey_token)
+    if survey is None:
+        cursor = get_db().cursor()
+        cursor.execute("SELECT id, user_id FROM surveys WHERE survey_token = ?", (survey_token,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        survey = (row[0], row[1])
+        survey_token_cache.set(survey_token, survey)
+    return survey
+
+# Columns compile_survey expects, ending with the version column
+SURVEY_COLUMNS = """id, title, description, questions, company_size, max_submissions,
+                   created_at, survey_token, COALESCE(updated_at, created_at)"""
+
+CompiledSurvey = namedtuple('CompiledSurvey', ['id', 'version', 'survey', 'body'])
+
+# (survey_id, version) -> CompiledSurvey; a new updated_at makes a new key
+survey_cache = LRUCache(SURVEY_CACHE_SIZE)
+
+# Ids per IN list when loading uncached surveys; SQLite builds before 3.32
+# allow at most 999 host parameters per statement
+SURVEY_FETCH_CHUNK = 500
+
+def compile_survey(row):
+    """Build the immutable API form of a surveys row selected with SURVEY_COLUMNS
+
+    The questions JSON is parsed and the link built once per version, and
+    the survey object is serialized ahead of time so responses can be
+    assembled from bytes.
+    """
+    survey_id, title, description, questions, company_size, max_submissions, created_at, survey_token, version = row
+    
+    try:
+        questions_data = json.loads(questions) if questions else []
+    except ValueError:
+        questions_data = []
+    
+    survey = {
+        'id': survey_id,
+        'title': title,
+        'description': description,
+        'questions': questions_data,
+        'company_size': company_size,
+        'max_submissions': max_submissions,
+        'created_at': created_at,
+        'survey_token': survey_token,
+        'survey_link': f"{SURVEY_LINK_BASE}{survey_token}" if survey_token else None
+    }
+    compiled = CompiledSurvey(survey_id, version, survey, dumps_json(survey, app.json.sort_keys))
+    survey_cache.set((survey_id, version), compiled)
+    return compiled
+
+def load_compiled_surveys(cursor, versions):
+    """Return CompiledSurvey objects for (survey_id, version) pairs, in order
+
+    Surveys missing from the cache are fetched SURVEY_FETCH_CHUNK ids per
+    query, staying under SQLite's host parameter limit, and compiled.
+    """
+    compiled = {}
+    missing = []
+    for survey_id, version in versions:
+        cached = survey_cache.get((survey_id, version))
+        if cached is None:
+            missing.append(survey_id)
+        else:
+            compiled[survey_id] = cached
     
-    conn = sqlite3.connect(db_path)
+    for start in range(0, len(missing), SURVEY_FETCH_CHUNK):
+        chunk = missing[start:start + SURVEY_FETCH_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f"SELECT {SURVEY_COLUMNS} FROM surveys WHERE id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            compiled[row[0]] = compile_survey(row)
+    
+    return [compiled[survey_id] for survey_id, _ in versions if survey_id in compiled]
+
+def json_bytes_response(body, status=200):
+    """Return already-serialized JSON bytes as a response"""
+    return app.response_class(body, status=status, mimetype='application/json')
+
+def init_database():
+    """Initialize database with required tables"""
+    db_path = get_db_path()
+    postgres = db_path is None
+    conn = connect_maintenance()
+    pk = "SERIAL PRIMARY KEY" if postgres else "INTEGER PRIMARY KEY AUTOINCREMENT"
     cursor = conn.cursor()
     
     # Create users table
-    cursor.execute("""
+    cursor.execute(f"""
         CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {pk},
             email TEXT UNIQUE NOT NULL,
             password_hash TEXT NOT NULL,
             company_name TEXT,
@@ -58,9 +861,9 @@ def init_database():
     """)
     
     # Create user_sessions table
-    cursor.execute("""
+    cursor.execute(f"""
         CREATE TABLE IF NOT EXISTS user_sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {pk},
             user_id INTEGER NOT NULL,
             token TEXT UNIQUE NOT NULL,
             expires_at TIMESTAMP NOT NULL,
@@ -69,35 +872,254 @@ def init_database():
         )
     """)
     
-    # Add user_id to surveys table if it doesn't exist
-    try:
-        cursor.execute("ALTER TABLE surveys ADD COLUMN user_id INTEGER")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Create surveys table
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS surveys (
+            id {pk},
+            title TEXT NOT NULL,
+            description TEXT,
+            questions TEXT DEFAULT '[]',
+            company_size TEXT,
+            max_submissions INTEGER,
+            status TEXT DEFAULT 'active',
+            user_id INTEGER,
+            survey_token TEXT UNIQUE,
+            current_submissions INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP
+        )
+    """)
     
-    # Add survey_token to surveys table if it doesn't exist
-    try:
-        cursor.execute("ALTER TABLE surveys ADD COLUMN survey_token TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Add columns to surveys tables created before them
+    for column in ("user_id INTEGER", "survey_token TEXT", "updated_at TIMESTAMP"):
+        if postgres:
+            cursor.execute(f"ALTER TABLE surveys ADD COLUMN IF NOT EXISTS {column}")
+            continue
+        try:
+            cursor.execute(f"ALTER TABLE surveys ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    
+    # Add the submission counter, remembering whether it needs seeding
+    if postgres:
+        cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'surveys' AND column_name = 'current_submissions'
+        """)
+        counter_added = cursor.fetchone() is None
+        if counter_added:
+            cursor.execute("ALTER TABLE surveys ADD COLUMN current_submissions INTEGER NOT NULL DEFAULT 0")
+    else:
+        try:
+            cursor.execute("ALTER TABLE surveys ADD COLUMN current_submissions INTEGER NOT NULL DEFAULT 0")
+            counter_added = True
+        except sqlite3.OperationalError:
+            counter_added = False  # Column already exists
+    
+    # Index survey_token for the public submit lookup
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_surveys_survey_token ON surveys (survey_token)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_surveys_user_id ON surveys (user_id, created_at)")
     
     # Create responses table
-    cursor.execute("""
+    cursor.execute(f"""
         CREATE TABLE IF NOT EXISTS responses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {pk},
             survey_id INTEGER NOT NULL,
             user_id INTEGER,
             response_data TEXT NOT NULL,
+            submission_key TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (survey_id) REFERENCES surveys (id),
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     """)
     
+    # Idempotency key of the public submission that created the response
+    if postgres:
+        cursor.execute("ALTER TABLE responses ADD COLUMN IF NOT EXISTS submission_key TEXT")
+    else:
+        try:
+            cursor.execute("ALTER TABLE responses ADD COLUMN submission_key TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_responses_submission_key ON responses (submission_key)")
+    
+    # Keyset pagination over a survey's responses
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_responses_survey_id ON responses (survey_id, id)")
+    
+    # Seed a newly added submission counter from the responses already stored
+    if counter_added:
+        cursor.execute("""
+            UPDATE surveys SET current_submissions = (
+                SELECT COUNT(*) FROM responses WHERE responses.survey_id = surveys.id
+            )
+        """)
+    
+    # Create response_answers table: one typed row per (response, question)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS response_answers (
+            id {pk},
+            response_id INTEGER NOT NULL,
+            survey_id INTEGER NOT NULL,
+            question_id TEXT NOT NULL,
+            numeric_value REAL,
+            text_value TEXT,
+            FOREIGN KEY (response_id) REFERENCES responses (id),
+            FOREIGN KEY (survey_id) REFERENCES surveys (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_response_answers_question
+        ON response_answers (survey_id, question_id, numeric_value)
+    """)
+    
+    # One answer per (response, question); earlier backfills racing across
+    # workers could store duplicates, which must go before the index can exist
+    if postgres:
+        cursor.execute("SELECT to_regclass('idx_response_answers_response_question')")
+        answers_unique = cursor.fetchone()[0] is not None
+    else:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_response_answers_response_question'"
+        )
+        answers_unique = cursor.fetchone() is not None
+    if not answers_unique:
+        cursor.execute("""
+            DELETE FROM response_answers WHERE id NOT IN (
+                SELECT MIN(id) FROM response_answers GROUP BY response_id, question_id
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_response_answers_response_question
+            ON response_answers (response_id, question_id)
+        """)
+        # Covered by the unique index
+        cursor.execute("DROP INDEX IF EXISTS idx_response_answers_response")
+    
+    # How far backfill_response_answers has got through the responses table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS backfill_progress (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute(
+        "INSERT INTO backfill_progress (name) VALUES ('response_answers') ON CONFLICT (name) DO NOTHING"
+    )
+    
     conn.commit()
+    
+    if response_answers_backfill_pending(conn):
+        print("Responses saved before response_answers existed are missing from the statistics; "
+              "run `python main.py backfill-answers` once to normalize them")
+    
     conn.close()
     print("Database initialized successfully")
 
+def connect_maintenance():
+    """Plain connection for schema setup and one-shot maintenance commands"""
+    if USE_POSTGRES:
+        return psycopg2.connect(DATABASE_URL, connect_timeout=5)
+    return connect_sqlite(get_db_path())
+
+# Legacy responses that still need response_answers rows: past the backfill
+# high-water mark and without answers
+BACKFILL_PENDING_SQL = """
+    SELECT r.id, r.survey_id, r.response_data
+    FROM responses r
+    LEFT JOIN response_answers a ON a.response_id = r.id
+    WHERE r.id > {placeholder} AND a.id IS NULL
+    ORDER BY r.id
+    LIMIT {limit}
+"""
+
+def _legacy_schema_errors():
+    # A legacy responses table without response_data fails the SELECT
+    if USE_POSTGRES:
+        return (sqlite3.OperationalError, psycopg2.Error)
+    return (sqlite3.OperationalError,)
+
+def _backfill_high_water(cursor, lock=False):
+    """Id of the last response the backfill has processed"""
+    placeholder = '%s' if USE_POSTGRES else '?'
+    cursor.execute(
+        f"SELECT last_id FROM backfill_progress WHERE name = {placeholder}" + (" FOR UPDATE" if lock and USE_POSTGRES else ""),
+        ('response_answers',)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def response_answers_backfill_pending(conn):
+    """True if some legacy response still has no response_answers rows"""
+    placeholder = '%s' if USE_POSTGRES else '?'
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            BACKFILL_PENDING_SQL.format(placeholder=placeholder, limit=1),
+            (_backfill_high_water(cursor),)
+        )
+        pending = cursor.fetchone() is not None
+    except _legacy_schema_errors():
+        pending = False
+    conn.rollback()
+    return pending
+
+def backfill_response_answers(conn, batch_size=1000):
+    """Normalize response_data blobs saved before response_answers existed
+
+    A one-shot step (`python main.py backfill-answers`), not run at import.
+    Each batch holds the write lock, so concurrent runs take turns, and moves
+    a high-water mark in backfill_progress, so responses without any answer
+    rows are not rescanned. Answers that already exist are left alone.
+    """
+    placeholder = '%s' if USE_POSTGRES else '?'
+    cursor = conn.cursor()
+    backfilled = 0
+    while True:
+        try:
+            if not USE_POSTGRES:
+                cursor.execute("BEGIN IMMEDIATE")
+            # On PostgreSQL the row lock on the mark serializes batches instead
+            last_id = _backfill_high_water(cursor, lock=True)
+            cursor.execute(
+                BACKFILL_PENDING_SQL.format(placeholder=placeholder, limit=int(batch_size)),
+                (last_id,)
+            )
+        except _legacy_schema_errors() as e:
+            print(f"Skipping response_answers backfill: {e}")  # legacy responses table
+            conn.rollback()
+            return
+        rows = cursor.fetchall()
+        if not rows:
+            conn.rollback()
+            break
+        
+        answer_rows = []
+        for response_id, survey_id, response_data in rows:
+            try:
+                data = json.loads(response_data) if response_data else {}
+            except ValueError:
+                data = {}
+            if isinstance(data, dict):
+                answer_rows.extend(
+                    (response_id, survey_id, question_id, numeric_value, text_value)
+                    for question_id, numeric_value, text_value in extract_answers(data)
+                )
+        if answer_rows:
+            cursor.executemany(f"""
+                INSERT INTO response_answers (response_id, survey_id, question_id, numeric_value, text_value)
+                VALUES ({', '.join([placeholder] * 5)})
+                ON CONFLICT (response_id, question_id) DO NOTHING
+            """, answer_rows)
+        cursor.execute(
+            f"UPDATE backfill_progress SET last_id = {placeholder} WHERE name = {placeholder}",
+            (rows[-1][0], 'response_answers')
+        )
+        conn.commit()
+        backfilled += len(rows)
+    
+    print(f"Backfilled response_answers for {backfilled} responses")
+
 def hash_password(password):
     """Hash password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -106,23 +1128,135 @@ def verify_password(password, hashed):
     """Verify password against hash"""
     return hash_password(password) == hashed
 
+SESSION_LIFETIME = timedelta(days=7)
+
 def create_token(user_id):
     """Create JWT token for user"""
     payload = {
         'user_id': user_id,
-        'exp': datetime.utcnow() + timedelta(days=7)
+        'exp': datetime.utcnow() + SESSION_LIFETIME
     }
     return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
 
+def token_digest(token):
+    """Stable key for a token that avoids keeping raw JWTs around"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# token digest -> user_id for tokens whose signature was already verified
+verified_token_cache = LRUCache(JWT_CACHE_SIZE)
+
 def verify_token(token):
-    """Verify JWT token and return user_id"""
+    """Verify JWT token and return user_id
+
+    Verified tokens are cached until their exp (at most JWT_CACHE_TTL
+    seconds), so repeat requests skip the decode and HMAC check.
+    """
+    digest = token_digest(token)
+    user_id = verified_token_cache.get(digest)
+    if user_id is not None:
+        return user_id
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        return payload['user_id']
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    
+    user_id = payload['user_id']
+    ttl = min(payload['exp'] - time.time(), JWT_CACHE_TTL)
+    if ttl > 0:
+        verified_token_cache.set(digest, user_id, ttl=ttl)
+    return user_id
+
+class SessionStore:
+    """Append-batched user_sessions writer with a periodic expiry sweep
+
+    Login and register only queue the session in memory; a background
+    thread writes queued sessions every SESSION_FLUSH_INTERVAL seconds and
+    deletes expired rows every SESSION_SWEEP_INTERVAL seconds, so the table
+    no longer grows without bound. Sessions store a token digest, not the JWT.
+    """
+
+    def __init__(self, flush_interval=SESSION_FLUSH_INTERVAL, flush_max=SESSION_FLUSH_MAX,
+                 sweep_interval=SESSION_SWEEP_INTERVAL):
+        self._flush_interval = flush_interval
+        self._flush_max = flush_max
+        self._sweep_interval = sweep_interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._last_sweep = time.monotonic()  # first sweep one interval after creation
+
+    def record(self, user_id, token):
+        """Queue a session row for the next flush"""
+        expires_at = datetime.utcnow() + SESSION_LIFETIME
+        with self._lock:
+            self._pending.append((user_id, token_digest(token), expires_at))
+            full = len(self._pending) >= self._flush_max
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write queued sessions and, when due, sweep expired ones"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        sweep = time.monotonic() - self._last_sweep >= self._sweep_interval
+        if not batch and not sweep:
+            return
+        
+        pool = get_pool()
+        conn = pool.acquire()
+        try:
+            cursor = conn.cursor()
+            if batch:
+                cursor.executemany("""
+                    INSERT INTO user_sessions (user_id, token, expires_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (token) DO NOTHING
+                """, batch)
+            if sweep:
+                cursor.execute("DELETE FROM user_sessions WHERE expires_at < ?", (datetime.utcnow(),))
+                self._last_sweep = time.monotonic()
+            conn.commit()
+        except Exception:
+            with self._lock:
+                self._pending[:0] = batch  # retry on the next flush
+            raise
+        finally:
+            pool.release(conn)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='session-store', daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush user sessions: {e}")
+
+_session_store = None
+_session_store_pid = None
+
+def get_session_store():
+    """Get this worker's session store, creating it lazily after fork"""
+    global _session_store, _session_store_pid
+    if _session_store_pid != os.getpid():
+        with _pool_lock:
+            if _session_store_pid != os.getpid():
+                _session_store = SessionStore()
+                _session_store_pid = os.getpid()
+    return _session_store
 
 def get_current_user():
     """Get current user from Authorization header"""
@@ -149,6 +1283,18 @@ def health():
 def api_health():
     return "API v1 is working"
 
+@app.route('/api/v1/health/db', methods=['GET'])
+def db_health():
+    """Connection pool metrics for this worker"""
+    return jsonify({
+        'backend': 'postgresql' if USE_POSTGRES else 'sqlite',
+        'pool': get_pool().stats(),
+        'submissions': get_submission_writer().stats(),
+        'survey_token_cache': survey_token_cache.stats(),
+        'survey_cache': survey_cache.stats(),
+        'jwt_cache': verified_token_cache.stats()
+    }), 200
+
 @app.route('/api/v1/auth/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -162,17 +1308,12 @@ def register():
         if not email or not password:
             return jsonify({'error': 'Email and password required'}), 400
         
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
         # Check if user exists
         cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'User already exists'}), 400
         
         # Create user
@@ -180,21 +1321,16 @@ def register():
         cursor.execute("""
             INSERT INTO users (email, password_hash, company_name, company_size)
             VALUES (?, ?, ?, ?)
+            RETURNING id
         """, (email, password_hash, company_name, company_size))
         
-        user_id = cursor.lastrowid
+        user_id = cursor.fetchone()[0]
+        
+        conn.commit()
         
         # Create session token
         token = create_token(user_id)
-        expires_at = datetime.utcnow() + timedelta(days=7)
-        
-        cursor.execute("""
-            INSERT INTO user_sessions (user_id, token, expires_at)
-            VALUES (?, ?, ?)
-        """, (user_id, token, expires_at))
-        
-        conn.commit()
-        conn.close()
+        get_session_store().record(user_id, token)
         
         return jsonify({
             'message': 'User registered successfully',
@@ -221,11 +1357,7 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email and password required'}), 400
         
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
         # Find user
@@ -236,22 +1368,13 @@ def login():
         
         user = cursor.fetchone()
         if not user or not verify_password(password, user[1]):
-            conn.close()
             return jsonify({'error': 'Invalid credentials'}), 401
         
         user_id, _, company_name, company_size = user
         
         # Create session token
         token = create_token(user_id)
-        expires_at = datetime.utcnow() + timedelta(days=7)
-        
-        cursor.execute("""
-            INSERT INTO user_sessions (user_id, token, expires_at)
-            VALUES (?, ?, ?)
-        """, (user_id, token, expires_at))
-        
-        conn.commit()
-        conn.close()
+        get_session_store().record(user_id, token)
         
         return jsonify({
             'message': 'Login successful',
@@ -275,11 +1398,7 @@ def get_current_user_info():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -289,11 +1408,8 @@ def get_current_user_info():
         
         user = cursor.fetchone()
         if not user:
-            conn.close()
             return jsonify({'error': 'User not found'}), 404
         
-        conn.close()
-        
         return jsonify({
             'user': {
                 'id': user[0],
@@ -315,50 +1431,20 @@ def get_surveys():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
-        # Get user's surveys
+        # Get the versions of the user's surveys, then their compiled forms
         cursor.execute("""
-            SELECT id, title, description, questions, company_size, max_submissions, 
-                   created_at, survey_token
+            SELECT id, COALESCE(updated_at, created_at)
             FROM surveys 
             WHERE user_id = ? 
             ORDER BY created_at DESC
         """, (user_id,))
         
-        surveys = []
-        for row in cursor.fetchall():
-            survey_id, title, description, questions, company_size, max_submissions, created_at, survey_token = row
-            
-            # Parse questions JSON
-            try:
-                questions_data = json.loads(questions) if questions else []
-            except:
-                questions_data = []
-            
-            # Generate survey link
-            survey_link = f"https://novorasurveys.com/survey/{survey_token}" if survey_token else None
-            
-            surveys.append({
-                'id': survey_id,
-                'title': title,
-                'description': description,
-                'questions': questions_data,
-                'company_size': company_size,
-                'max_submissions': max_submissions,
-                'created_at': created_at,
-                'survey_token': survey_token,
-                'survey_link': survey_link
-            })
+        surveys = load_compiled_surveys(cursor, cursor.fetchall())
         
-        conn.close()
-        
-        return jsonify({'surveys': surveys}), 200
+        return json_bytes_response(b'{"surveys":[' + b','.join(survey.body for survey in surveys) + b']}')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -381,29 +1467,31 @@ def create_survey():
         if not title:
             return jsonify({'error': 'Title is required'}), 400
         
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
         # Generate survey token
         survey_token = f"mvp-user-{user_id}_{secrets.token_hex(8)}"
         
         # Create survey
-        cursor.execute("""
-            INSERT INTO surveys (title, description, questions, company_size, max_submissions, user_id, survey_token)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (title, description, json.dumps(questions), company_size, max_submissions, user_id, survey_token))
+        cursor.execute(f"""
+            INSERT INTO surveys (title, description, questions, company_size, max_submissions, user_id, survey_token, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING {SURVEY_COLUMNS}
+        """, (title, description, json.dumps(questions), company_size, max_submissions, user_id, survey_token,
+              datetime.utcnow()))
         
-        survey_id = cursor.lastrowid
+        row = cursor.fetchone()
+        survey_id = row[0]
         
         conn.commit()
-        conn.close()
+        
+        # Replace any cached resolution so the new link resolves immediately
+        survey_token_cache.set(survey_token, (survey_id, user_id))
+        compile_survey(row)
         
         # Generate survey link
-        survey_link = f"https://novorasurveys.com/survey/{survey_token}"
+        survey_link = f"{SURVEY_LINK_BASE}{survey_token}"
         
         return jsonify({
             'message': 'Survey created successfully',
@@ -431,102 +1519,223 @@ def get_survey(survey_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
-        # Get survey (must belong to user)
+        # Get survey version (must belong to user)
         cursor.execute("""
-            SELECT id, title, description, questions, company_size, max_submissions, 
-                   created_at, survey_token
+            SELECT id, COALESCE(updated_at, created_at)
             FROM surveys 
             WHERE id = ? AND user_id = ?
         """, (survey_id, user_id))
         
+        surveys = load_compiled_surveys(cursor, cursor.fetchall())
+        if not surveys:
+            return jsonify({'error': 'Survey not found'}), 404
+        
+        return json_bytes_response(b'{"survey":' + surveys[0].body + b'}')
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/v1/surveys/<int:survey_id>', methods=['DELETE'])
+def delete_survey(survey_id):
+    """Delete a survey and its responses"""
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Survey must belong to user
+        cursor.execute("SELECT survey_token FROM surveys WHERE id = ? AND user_id = ?", (survey_id, user_id))
         survey = cursor.fetchone()
         if not survey:
-            conn.close()
             return jsonify({'error': 'Survey not found'}), 404
         
-        survey_id, title, description, questions, company_size, max_submissions, created_at, survey_token = survey
+        cursor.execute("DELETE FROM response_answers WHERE survey_id = ?", (survey_id,))
+        cursor.execute("DELETE FROM responses WHERE survey_id = ?", (survey_id,))
+        cursor.execute("DELETE FROM surveys WHERE id = ?", (survey_id,))
+        conn.commit()
+        
+        # Stop resolving the public link
+        survey_token_cache.pop(survey[0])
         
-        # Parse questions JSON
-        try:
-            questions_data = json.loads(questions) if questions else []
-        except:
-            questions_data = []
+        return jsonify({'message': f'Survey {survey_id} deleted successfully'}), 200
         
-        # Generate survey link
-        survey_link = f"https://novorasurveys.com/survey/{survey_token}" if survey_token else None
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/v1/surveys/<int:survey_id>/responses', methods=['GET'])
+def get_survey_responses(survey_id):
+    """Get responses for a survey, one keyset page at a time or streamed as NDJSON
+
+    Query parameters:
+        after_id: Only return responses with a larger id (default 0)
+        limit: Page size for JSON pages (default RESPONSES_PAGE_SIZE)
+        format: 'ndjson' streams every remaining response, one per line
+    """
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        after_id = request.args.get('after_id', 0, type=int)
+        limit = request.args.get('limit', RESPONSES_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, RESPONSES_PAGE_MAX))
+        
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Verify survey belongs to user
+        cursor.execute("SELECT id FROM surveys WHERE id = ? AND user_id = ?", (survey_id, user_id))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Survey not found'}), 404
         
-        conn.close()
+        if request.args.get('format') == 'ndjson':
+            return Response(
+                stream_survey_responses(survey_id, after_id),
+                mimetype='application/x-ndjson'
+            )
+        
+        # Fetch one extra row to know whether another page exists
+        responses = [
+            decode_response_row(row)
+            for row in fetch_response_page(cursor, survey_id, after_id, limit + 1)
+        ]
+        has_more = len(responses) > limit
+        responses = responses[:limit]
         
         return jsonify({
-            'survey': {
-                'id': survey_id,
-                'title': title,
-                'description': description,
-                'questions': questions_data,
-                'company_size': company_size,
-                'max_submissions': max_submissions,
-                'created_at': created_at,
-                'survey_token': survey_token,
-                'survey_link': survey_link
-            }
+            'responses': responses,
+            'next_after_id': responses[-1]['id'] if has_more else None
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/v1/surveys/<int:survey_id>/responses', methods=['GET'])
-def get_survey_responses(survey_id):
-    """Get responses for a survey"""
+def fetch_response_page(cursor, survey_id, after_id, limit):
+    """Fetch up to ``limit`` raw response rows with id > after_id"""
+    cursor.execute("""
+        SELECT id, response_data, created_at
+        FROM responses
+        WHERE survey_id = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """, (survey_id, after_id, limit))
+    return cursor.fetchall()
+
+def decode_response_row(row):
+    """Turn a (id, response_data, created_at) row into the API's response dict"""
+    response_id, response_data, created_at = row
+    try:
+        data = json.loads(response_data) if response_data else {}
+    except ValueError:
+        data = {}
+    
+    return {
+        'id': response_id,
+        'data': data,
+        'created_at': created_at.isoformat() if isinstance(created_at, datetime) else created_at
+    }
+
+def stream_survey_responses(survey_id, after_id):
+    """Yield NDJSON lines chunk by chunk so memory stays flat for any survey size
+
+    Runs after the request's connection has been released, so it checks
+    out its own connection for the duration of the stream.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        while True:
+            rows = fetch_response_page(cursor, survey_id, after_id, RESPONSES_STREAM_CHUNK)
+            if not rows:
+                break
+            yield b''.join(dumps_json(decode_response_row(row)) + b'\n' for row in rows)
+            after_id = rows[-1][0]
+    finally:
+        pool.release(conn)
+
+@app.route('/api/v1/surveys/<int:survey_id>/analytics', methods=['GET'])
+def get_survey_analytics(survey_id):
+    """Per-question answer count and numeric mean/min/max for a survey"""
     user_id = get_current_user()
     if not user_id:
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
+        conn = get_db()
         cursor = conn.cursor()
         
         # Verify survey belongs to user
         cursor.execute("SELECT id FROM surveys WHERE id = ? AND user_id = ?", (survey_id, user_id))
         if not cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'Survey not found'}), 404
         
-        # Get responses
         cursor.execute("""
-            SELECT id, response_data, created_at
-            FROM responses 
+            SELECT question_id, COUNT(*), COUNT(numeric_value),
+                   AVG(numeric_value), MIN(numeric_value), MAX(numeric_value)
+            FROM response_answers
             WHERE survey_id = ?
-            ORDER BY created_at DESC
+            GROUP BY question_id
+            ORDER BY question_id
         """, (survey_id,))
         
-        responses = []
-        for row in cursor.fetchall():
-            response_id, response_data, created_at = row
-            try:
-                data = json.loads(response_data) if response_data else {}
-            except:
-                data = {}
-            
-            responses.append({
-                'id': response_id,
-                'data': data,
-                'created_at': created_at
+        questions = []
+        for question_id, count, numeric_count, mean, minimum, maximum in cursor.fetchall():
+            questions.append({
+                'question_id': question_id,
+                'count': count,
+                'numeric_count': numeric_count,
+                'mean': round(mean, 4) if mean is not None else None,
+                'min': minimum,
+                'max': maximum
             })
         
-        conn.close()
+        return jsonify({'survey_id': survey_id, 'questions': questions}), 200
         
-        return jsonify({'responses': responses}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/v1/surveys/<int:survey_id>/analytics/<question_id>/histogram', methods=['GET'])
+def get_question_histogram(survey_id, question_id):
+    """Distribution of answers to one question"""
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        
+        # Verify survey belongs to user
+        cursor.execute("SELECT id FROM surveys WHERE id = ? AND user_id = ?", (survey_id, user_id))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Survey not found'}), 404
+        
+        cursor.execute("""
+            SELECT numeric_value, text_value, COUNT(*)
+            FROM response_answers
+            WHERE survey_id = ? AND question_id = ?
+            GROUP BY numeric_value, text_value
+            ORDER BY numeric_value, text_value
+        """, (survey_id, question_id))
+        
+        buckets = [
+            {'value': numeric_value if numeric_value is not None else text_value, 'count': count}
+            for numeric_value, text_value, count in cursor.fetchall()
+        ]
+        
+        return jsonify({
+            'survey_id': survey_id,
+            'question_id': question_id,
+            'total': sum(bucket['count'] for bucket in buckets),
+            'buckets': buckets
+        }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -541,33 +1750,42 @@ def submit_survey_response(survey_token):
         if not response_data:
             return jsonify({'error': 'Response data required'}), 400
         
-        db_path = get_db_path()
-        if not db_path:
-            return jsonify({'error': 'Database not available'}), 500
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
         # Find survey by token
-        cursor.execute("SELECT id, user_id FROM surveys WHERE survey_token = ?", (survey_token,))
-        survey = cursor.fetchone()
+        survey = resolve_survey_token(survey_token)
         if not survey:
-            conn.close()
             return jsonify({'error': 'Survey not found'}), 404
         
         survey_id, user_id = survey
         
-        # Save response
-        cursor.execute("""
-            INSERT INTO responses (survey_id, user_id, response_data)
-            VALUES (?, ?, ?)
-        """, (survey_id, user_id, json.dumps(response_data)))
+        # Clients may send an Idempotency-Key so a retried submission is not
+        # stored twice; otherwise one is assigned and returned
+        submission_key = request.headers.get('Idempotency-Key')
+        if submission_key is not None and not 0 < len(submission_key) <= 255:
+            return jsonify({'error': 'Idempotency-Key must be 1-255 characters'}), 400
         
-        conn.commit()
-        conn.close()
+        # Save response (group-committed with concurrent submissions)
+        submission_key, duplicate = get_submission_writer().submit(
+            survey_id, user_id, response_data, submission_key=submission_key
+        )
         
-        return jsonify({'message': 'Response submitted successfully'}), 200
+        return jsonify({
+            'message': 'Response already submitted' if duplicate else 'Response submitted successfully',
+            'submission_id': submission_key
+        }), 200
         
+    except SubmissionPending as e:
+        # Not an error: the response may still commit. Retrying with this key
+        # answers 200 once it has, and never stores it twice
+        response = jsonify({'message': str(e), 'submission_id': e.submission_key})
+        response.headers['Idempotency-Key'] = e.submission_key
+        return response, 202
+    except SurveyNotFound as e:
+        survey_token_cache.pop(survey_token)
+        return jsonify({'error': str(e)}), 404
+    except SurveyFull as e:
+        return jsonify({'error': str(e)}), 403
+    except SubmissionQueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -580,6 +1798,14 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    if sys.argv[1:] == ['backfill-answers']:
+        conn = connect_maintenance()
+        try:
+            backfill_response_answers(conn)
+        finally:
+            conn.close()
+        sys.exit(0)
+    
     port = int(os.environ.get('PORT', 8000))
     db_path = get_db_path()
     print(f"Database path: {db_path}")